@@ -0,0 +1,182 @@
+import re
+from datetime import date, timedelta
+from db.db_manager import get_categories, get_category_totals
+
+# Questions that ask for judgement rather than numbers always go to the assistant.
+OPEN_ENDED = re.compile(r"\b(why|should|advice|advise|suggest|recommend|tips?|plan|budget|save more|how can|how do)\b")
+
+_SPEND = re.compile(r"\b(spent|spend|spending|expenses?|paid|pay)\b")
+_TOP = re.compile(r"\b(top|biggest|largest|most|highest)\b.*\b(categor(y|ies)|spend|spending|expenses?)\b"
+                  r"|\b(categor(y|ies)|spend|spending|spent|expenses?)\b.*\b(top|biggest|largest|most|highest)\b")
+# "on X" / "for X": what the money went on. Period and filler words are not objects.
+_OBJECT = re.compile(r"\b(?:on|for) (?!(?:the|this|that|last|past|a|an|my|me|it|average|each|every|today|"
+                     r"yesterday|day|week|month|year|all|everything|total)\b)([a-z]\w*)")
+_CHANGE = re.compile(r"\b(compared?|vs\.?|versus|change|week over week|difference)\b|\b(more|less)\b.*\bthan\b")
+_AVERAGE = re.compile(r"\b(average|avg|mean|per (day|week|month))\b")
+# Explicit units win over the period, so "average daily spending this week" is per day.
+_UNITS = (("day", re.compile(r"\b(per day|daily|a day|each day)\b")),
+          ("week", re.compile(r"\b(per week|weekly|a week|each week)\b")),
+          ("month", re.compile(r"\b(per month|monthly|a month|each month)\b")))
+# About one expense rather than a category total, e.g. "my biggest expense this month".
+_SINGLE_EXPENSE = re.compile(r"\b(biggest|largest|highest|smallest|most expensive|priciest) "
+                             r"(single )?(expense|purchase|payment|transaction)s?\b|\bmost expensive\b")
+_LAST_N_DAYS = re.compile(r"\b(?:last|past) (\d{1,3}) days\b")
+_PERIODS = re.compile(r"\b(today|yesterday|(?:this|last) (?:week|month|year)|(?:last|past) \d{1,3} days)\b")
+_WEEKS = {"this week", "last week"}
+# A list around a category ("coffee and groceries") asks about more than that one category.
+_JOINED = r"(?:,|\s(?:and|or|&|plus))\s"
+
+
+def _week_start(d):
+    # Sunday-based weeks, matching the rollups (SQL Server DATEPART(WEEK, ...)).
+    return d - timedelta(days=(d.weekday() + 1) % 7)
+
+
+def _month_start(d):
+    return d.replace(day=1)
+
+
+def resolve_period(question, today):
+    """(start, end, label) for the period mentioned in the question, or None."""
+    tomorrow = today + timedelta(days=1)
+    match = _LAST_N_DAYS.search(question)
+    if match:
+        days = int(match.group(1))
+        return today - timedelta(days=days - 1), tomorrow, f"in the last {days} days"
+    if "yesterday" in question:
+        return today - timedelta(days=1), today, "yesterday"
+    if "today" in question:
+        return today, tomorrow, "today"
+    if "last week" in question:
+        start = _week_start(today) - timedelta(weeks=1)
+        return start, start + timedelta(weeks=1), "last week"
+    if "this week" in question:
+        return _week_start(today), tomorrow, "this week"
+    if "last month" in question:
+        end = _month_start(today)
+        return _month_start(end - timedelta(days=1)), end, "last month"
+    if "this month" in question:
+        return _month_start(today), tomorrow, "this month"
+    if "last year" in question:
+        return date(today.year - 1, 1, 1), date(today.year, 1, 1), "last year"
+    if "this year" in question:
+        return date(today.year, 1, 1), tomorrow, "this year"
+    return None
+
+
+def _category_pattern(category):
+    name = category.lower()
+    stem = re.sub(r"(ies|s)$", "", name)
+    return rf"\b(?:{re.escape(name)}|{re.escape(stem)}(?:y|ies|s)?)\b"
+
+
+def match_categories(question, categories):
+    """Categories named in the question (case-insensitive, singular or plural), longest first."""
+    found = []
+    for category in sorted(categories, key=len, reverse=True):
+        pattern = _category_pattern(category)
+        if re.search(pattern, question):
+            found.append(category)
+            # "fast food" should not also count as "food".
+            question = re.sub(pattern, " ", question)
+    return found
+
+
+def match_category(question, categories):
+    """Category named in the question, if any."""
+    found = match_categories(question, categories)
+    return found[0] if found else None
+
+
+def parse_intent(question, categories, today):
+    """Classify a question into one of the supported shapes, or None to leave it to the assistant."""
+    q = " ".join(question.lower().split())
+    if OPEN_ENDED.search(q):
+        return None
+    if not (_SPEND.search(q) or _TOP.search(q)):
+        return None  # e.g. "how much money do I have left" is not about spending
+    if _SINGLE_EXPENSE.search(q):
+        return None
+    named = match_categories(q, categories)
+    if len(named) > 1:
+        return None
+    category = named[0] if named else None
+    if category is None and _OBJECT.search(q):
+        # Names something that isn't one of the user's categories (e.g. "on uber");
+        # a grand total would answer the wrong question.
+        return None
+    if category is not None:
+        pattern = _category_pattern(category)
+        if re.search(rf"\w{_JOINED}{pattern}|{pattern}{_JOINED}\w", q):
+            return None
+
+    periods = set(_PERIODS.findall(q))
+    if _CHANGE.search(q):
+        # Only week-over-week comparisons are answered here.
+        if "week" in q and periods <= _WEEKS:
+            return {"kind": "change", "category": category}
+        return None
+    if len(periods) > 1:
+        return None
+    period = resolve_period(q, today)
+
+    if _AVERAGE.search(q):
+        unit = next((unit for unit, pattern in _UNITS if pattern.search(q)), "day")
+        return {"kind": "average", "category": category, "unit": unit, "period": period}
+    if _TOP.search(q) and category is None:
+        return {"kind": "top", "period": period}
+    return {"kind": "total", "category": category, "period": period}
+
+
+def _sum(totals, category=None):
+    if category is not None:
+        return totals.get(category, (0.0, 0))
+    return sum(t for t, _ in totals.values()), sum(n for _, n in totals.values())
+
+
+def _what(category):
+    return f"on {category}" if category else "in total"
+
+
+def answer(email, question, today=None):
+    """Answer a supported question straight from DB aggregates; None means ask the assistant."""
+    today = today or date.today()
+    intent = parse_intent(question, get_categories(email), today)
+    if intent is None:
+        return None
+    kind = intent["kind"]
+    category = intent.get("category")
+
+    if kind == "change":
+        this_start = _week_start(today)
+        last_start = this_start - timedelta(weeks=1)
+        current, _ = _sum(get_category_totals(email, this_start, today + timedelta(days=1)), category)
+        previous, _ = _sum(get_category_totals(email, last_start, this_start), category)
+        if previous:
+            change = f"{(current - previous) / previous:+.0%}"
+        else:
+            change = "no spending last week to compare with"
+        return (f"You spent ₹{current:,.2f} {_what(category)} this week vs ₹{previous:,.2f} last week "
+                f"({change}).")
+
+    if kind == "average":
+        start, end, label = intent["period"] or (today - timedelta(weeks=8) + timedelta(days=1),
+                                                 today + timedelta(days=1), "over the last 8 weeks")
+        total, _ = _sum(get_category_totals(email, start, end), category)
+        days = (end - start).days
+        per = {"day": 1, "week": 7, "month": 30}[intent["unit"]]
+        average = total / max(days / per, 1)
+        return f"You spent on average ₹{average:,.2f} per {intent['unit']} {_what(category)} {label}."
+
+    start, end, label = intent["period"] or (date(1900, 1, 1), today + timedelta(days=1), "so far")
+    totals = get_category_totals(email, start, end)
+
+    if kind == "top":
+        if not totals:
+            return f"No expenses found {label}."
+        top = sorted(totals.items(), key=lambda item: -item[1][0])[:3]
+        listed = ", ".join(f"{c} ₹{t:,.2f}" for c, (t, _) in top)
+        return f"Your top spending categories {label}: {listed}."
+
+    total, count = _sum(totals, category)
+    return f"You spent ₹{total:,.2f} {_what(category)} {label} across {count} expense(s)."
@@ -0,0 +1,95 @@
+from collections import defaultdict
+from datetime import date, timedelta
+from db.db_manager import get_expense_summary, get_rollups, week_key
+
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token for English/number-heavy text)."""
+    return len(text) // 4 + 1
+
+
+def _fmt(amount):
+    return f"{amount:,.0f}"
+
+
+def _recent_weeks(today, n):
+    """The last n distinct (year, week) keys, newest first.
+
+    Walks back day by day: the week around January 1st is split into two keys
+    (e.g. (2025, 53) and (2026, 1)), which 7-day steps would skip.
+    """
+    weeks = []
+    day = today
+    while len(weeks) < n:
+        key = week_key(day)
+        if key not in weeks:
+            weeks.append(key)
+        day -= timedelta(days=1)
+    return weeks
+
+
+def _render(weeks, totals, categories, notable, n_weeks, n_categories, n_notable):
+    shown = weeks[:n_weeks]
+    week_sum = {wk: sum(totals[(wk, c)] for c in categories) for wk in weeks}
+    this_week, last_week = week_sum[weeks[0]], week_sum[weeks[1]]
+    recent4 = sum(week_sum[wk] for wk in weeks[:4])
+    prior4 = sum(week_sum[wk] for wk in weeks[4:8])
+
+    lines = [
+        f"Spending summary (₹), current week {weeks[0][0]}-W{weeks[0][1]:02d}:",
+        f"this week {_fmt(this_week)}, last week {_fmt(last_week)} ({_delta(this_week, last_week)}); "
+        f"last 4 weeks {_fmt(recent4)} vs previous 4 {_fmt(prior4)} ({_delta(recent4, prior4)})",
+        "category|" + "|".join(f"W{wk[1]:02d}" for wk in shown) + "|total",
+    ]
+    for category in categories[:n_categories]:
+        row = [totals[(wk, category)] for wk in shown]
+        if any(row):
+            lines.append(f"{category}|" + "|".join(_fmt(v) for v in row) + f"|{_fmt(sum(row))}")
+    lines.append("ALL|" + "|".join(_fmt(week_sum[wk]) for wk in shown)
+                 + f"|{_fmt(sum(week_sum[wk] for wk in shown))}")
+    if n_notable:
+        lines.append("largest recent: " + "; ".join(
+            f"{item['expense_date']} {item['category']} {_fmt(item['amount'])}" for item in notable[:n_notable]))
+    return "\n".join(lines)
+
+
+def _delta(current, previous):
+    if not previous:
+        return "n/a"
+    return f"{(current - previous) / previous:+.0%}"
+
+
+def build_financial_context(email, token_budget=600, weeks=8, notable_items=5, today=None):
+    """Compact, pre-aggregated text describing a user's spending for assistant prompts.
+
+    Contains week-over-week and 4-week deltas, a category x week table of totals
+    from ExpenseRollups and the largest recent expenses. Week columns and notable
+    items, then the oldest week columns, then the smallest categories are dropped
+    until the text fits `token_budget`; the ALL row always covers every category.
+    """
+    today = today or date.today()
+    week_list = _recent_weeks(today, max(weeks, 8))
+    wanted = set(week_list)
+
+    totals = defaultdict(float)
+    for row in get_rollups(email, since_year=min(y for y, _ in week_list)):
+        wk = (row[0], row[1])
+        if wk in wanted:
+            totals[(wk, row[2])] += float(row[3])
+    categories = sorted({c for _, c in totals}, key=lambda c: -sum(totals[(wk, c)] for wk in week_list))
+
+    notable = sorted(get_expense_summary(email), key=lambda item: -float(item["amount"]))
+
+    n_weeks, n_categories, n_notable = weeks, len(categories), notable_items
+    text = _render(week_list, totals, categories, notable, n_weeks, n_categories, n_notable)
+    while estimate_tokens(text) > token_budget:
+        if n_notable > 0:
+            n_notable -= 1
+        elif n_weeks > 2:
+            n_weeks -= 1
+        elif n_categories > 0:
+            n_categories -= 1
+        else:
+            break
+        text = _render(week_list, totals, categories, notable, n_weeks, n_categories, n_notable)
+    return text
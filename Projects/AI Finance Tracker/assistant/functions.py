@@ -1,8 +1,29 @@
-from db.db_manager import add_expense, get_expense_summary, get_weekly_expense
+from db.db_manager import add_expense, get_weekly_expense
 from assistant.thread_manager import client,get_or_create_thread
+from assistant.run_waiter import wait_for_run
+from assistant.outbox import Outbox
+from assistant.context_builder import build_financial_context, estimate_tokens
+from assistant import analytics
+from utils.cache import user_cache
 import time
+import uuid
+from datetime import date
+from utils.config import RUN_TIMEOUT_SECONDS, OUTBOX_DB, CONTEXT_TOKEN_BUDGET
+
+def _post_to_thread(thread_id, content):
+    client.beta.threads.messages.create(thread_id=thread_id, role="user", content=content)
+
+# Thread messages about new expenses are posted in the background so the form
+# only waits for the DB write.
+outbox = Outbox(OUTBOX_DB, send=_post_to_thread).start()
 
 def add_expense_fn(params):
+    # A submit_id is minted once per form render, so a replayed submit (e.g. a
+    # double click that interrupts the first rerun) is not saved twice.
+    submit_id = params.get("submit_id") or uuid.uuid4().hex
+    if outbox.has_key(submit_id):
+        return {"message": "This expense was already added."}
+
     # 1. Add to DB
     add_expense(
         email=params["email"],
@@ -11,13 +32,16 @@ def add_expense_fn(params):
         expense_date=params["date"],
         thread_id = params["thread_id"]
     )
-
-    # 2. Add message to thread
-    thread_id = get_or_create_thread(params["email"])
-    client.beta.threads.messages.create(
-        thread_id=thread_id,
-        role="user",
-        content=f"Added an expense: {params['category']} - ₹{params['amount']} on {params['date']}"
+    # Stats and charts derived from this user's expenses are now stale.
+    user_cache.invalidate(params["email"])
+
+    # 2. Queue message for the thread (sent by the outbox worker)
+    # Keyed per submit, so two identical real expenses still get two messages.
+    thread_id = params.get("thread_id") or get_or_create_thread(params["email"])
+    outbox.enqueue(
+        thread_id,
+        f"Added an expense: {params['category']} - ₹{params['amount']} on {params['date']}",
+        dedupe_key=submit_id
     )
 
     # ✅ Return success response
@@ -28,9 +52,21 @@ def add_expense_fn(params):
 
 
 
+def get_financial_context(email):
+    """Compact spending context for prompts, cached until the user's next write."""
+    today = date.today()
+    # Versioned by day, so "this week" and the deltas roll over without a write.
+    return user_cache.get_or_compute(
+        email, "financial_context",
+        lambda: build_financial_context(email, token_budget=CONTEXT_TOKEN_BUDGET, today=today),
+        version=today
+    )
+
 def get_summary_fn(params):
 
-    db_response = get_expense_summary(email=params["email"])
+    started = time.perf_counter()
+    db_response = get_financial_context(params["email"])
+    print(f"Financial context: ~{estimate_tokens(db_response)} tokens")
 
     prompt = f""" Based on user query, conversation history and the database response generate the summary of the financial expense of the user.
     <user query>
@@ -57,39 +93,21 @@ def get_summary_fn(params):
     )
 
     # --- Wait until run completes ---
-    while True:
-        run_status = client.beta.threads.runs.retrieve(
-            thread_id=params["thread_id"],
-            run_id=run.id
-        )
-        print("Current status:", run_status.status)
-
-        if run_status.status == "completed":
-            break
-        elif run_status.status == "requires_action":
-            # Extract tool calls
-            tool_calls = run_status.required_action.submit_tool_outputs.tool_calls
-            outputs = []
-
-            for tool_call in tool_calls:
-                if tool_call.function.name == "get_expense_summary":
-                    result = get_expense_summary(email=params["email"])
-                    outputs.append({
-                        "tool_call_id": tool_call.id,
-                        "output": str(result)
-                    })
-            # Submit results back to the run
-            client.beta.threads.runs.submit_tool_outputs(
-            thread_id=params["thread_id"],
-            run_id=run.id,
-            tool_outputs=outputs
-            )
-
-        elif run_status.status in ["failed", "expired", "cancelled"]:
-            raise Exception(f"Run failed with status {run_status.status}")
-        time.sleep(5)
-        
-        
+    def handle_tool_calls(tool_calls):
+        outputs = []
+        for tool_call in tool_calls:
+            if tool_call.function.name == "get_expense_summary":
+                # Same pre-aggregated context as the prompt; no second DB query.
+                outputs.append({
+                    "tool_call_id": tool_call.id,
+                    "output": db_response
+                })
+        return outputs
+
+    run_status, waited = wait_for_run(client, params["thread_id"], run.id, handle_tool_calls,
+                                      timeout=RUN_TIMEOUT_SECONDS)
+    print(f"Run {run_status.status} in {waited:.2f}s ({time.perf_counter() - started:.2f}s total)")
+
     # --- Now fetch assistant reply ---
     response = client.beta.threads.messages.list(thread_id=params["thread_id"])
 
@@ -103,5 +121,19 @@ def get_summary_fn(params):
 
     return "No assistant reply found."
 
+def answer_question_fn(params):
+    """Answer common numeric questions locally; anything open-ended goes to the assistant."""
+    email = params["email"]
+    question = " ".join(params["user_message"].lower().split())
+    today = date.today()
+    # Versioned by day, so "this week" answers roll over without a write.
+    answer = user_cache.get_or_compute(email, ("answer", question),
+                                       lambda: analytics.answer(email, question, today),
+                                       version=today)
+    if answer is not None:
+        return answer
+    return get_summary_fn(params)
+
 def get_weekly_stats_fn(params):
-    return get_weekly_expense(email=params["email"])
+    email = params["email"]
+    return user_cache.get_or_compute(email, "weekly_stats", lambda: get_weekly_expense(email=email))
@@ -0,0 +1,154 @@
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+
+class Outbox:
+    """Durable queue of messages to post to assistant threads.
+
+    `enqueue` only writes a row to a local SQLite file, so callers never wait on
+    OpenAI. A background worker posts pending messages, merging everything queued
+    for the same thread into one message, and retries failures with exponential
+    backoff. A message whose `dedupe_key` has been queued before, pending or
+    sent, is dropped; the key should identify the event (e.g. one form submit),
+    not the text, since two real expenses can produce identical messages.
+
+    Rows are claimed before they are sent. If the process dies mid-send, the
+    claimed rows are marked sent on the next start instead of being posted again,
+    so delivery is at most once: a crash can lose a message but never repeat one.
+    """
+
+    def __init__(self, path, send, batch_size=20, poll_interval=2.0,
+                 base_backoff=2.0, max_backoff=300.0):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._send = send
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                thread_id TEXT NOT NULL,
+                content TEXT NOT NULL,
+                dedupe_key TEXT UNIQUE,
+                created REAL NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt REAL NOT NULL,
+                claimed REAL,
+                sent REAL
+            )
+        """)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(outbox)")}
+        if "claimed" not in columns:
+            self._conn.execute("ALTER TABLE outbox ADD claimed REAL")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_outbox_pending ON outbox (sent, next_attempt)")
+        abandoned = self._conn.execute(
+            "UPDATE outbox SET sent = claimed WHERE sent IS NULL AND claimed IS NOT NULL"
+        ).rowcount
+        if abandoned:
+            print(f"Outbox: {abandoned} message(s) were mid-send at shutdown and may not have been delivered")
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._worker = None
+
+    def enqueue(self, thread_id, content, dedupe_key=None):
+        """Queue a message; returns False if the dedupe_key has been queued before."""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT OR IGNORE INTO outbox (thread_id, content, dedupe_key, created, next_attempt) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (thread_id, content, dedupe_key, now, now),
+            )
+            self._conn.commit()
+        self._wake.set()
+        return cursor.rowcount == 1
+
+    def has_key(self, dedupe_key):
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM outbox WHERE dedupe_key = ?", (dedupe_key,)).fetchone()
+        return row is not None
+
+    def pending_count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM outbox WHERE sent IS NULL").fetchone()[0]
+
+    def _claim_due_batches(self):
+        """Claim pending messages that are due, grouped by thread in queue order."""
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, thread_id, content, attempts FROM outbox "
+                "WHERE sent IS NULL AND claimed IS NULL AND next_attempt <= ? ORDER BY id",
+                (now,),
+            ).fetchall()
+            batches = OrderedDict()
+            for row_id, thread_id, content, attempts in rows:
+                batch = batches.setdefault(thread_id, [])
+                if len(batch) < self.batch_size:
+                    batch.append((row_id, content, attempts))
+            ids = [row_id for batch in batches.values() for row_id, _, _ in batch]
+            if ids:
+                self._conn.execute(
+                    f"UPDATE outbox SET claimed = ? WHERE id IN ({','.join('?' * len(ids))})",
+                    (now, *ids),
+                )
+                self._conn.commit()
+        return batches
+
+    def flush(self):
+        """Send every due batch once; returns the number of messages delivered."""
+        delivered = 0
+        for thread_id, batch in self._claim_due_batches().items():
+            ids = [row_id for row_id, _, _ in batch]
+            placeholders = ",".join("?" * len(ids))
+            try:
+                self._send(thread_id, "\n".join(content for _, content, _ in batch))
+            except Exception as e:
+                attempts = max(a for _, _, a in batch) + 1
+                delay = min(self.max_backoff, self.base_backoff * 2 ** (attempts - 1))
+                delay *= random.uniform(0.8, 1.2)
+                print(f"Outbox: sending to {thread_id} failed ({e}); retry in {delay:.0f}s")
+                with self._lock:
+                    self._conn.execute(
+                        f"UPDATE outbox SET attempts = ?, next_attempt = ?, claimed = NULL WHERE id IN ({placeholders})",
+                        (attempts, time.time() + delay, *ids),
+                    )
+                    self._conn.commit()
+                continue
+            with self._lock:
+                # dedupe_key is kept, so a replayed submit stays a duplicate after sending.
+                self._conn.execute(
+                    f"UPDATE outbox SET sent = ? WHERE id IN ({placeholders})",
+                    (time.time(), *ids),
+                )
+                self._conn.commit()
+            delivered += len(ids)
+        return delivered
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.flush()
+            except Exception as e:
+                print("Outbox worker error:", e)
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def start(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="thread-outbox", daemon=True)
+            self._worker.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
@@ -0,0 +1,61 @@
+import time
+
+
+class RunFailed(Exception):
+    pass
+
+
+class RunTimeout(Exception):
+    pass
+
+
+TERMINAL_FAILURES = ("failed", "expired", "cancelled", "incomplete")
+
+
+def wait_for_run(client, thread_id, run_id, handle_tool_calls, timeout=60.0,
+                 initial_delay=0.1, max_delay=2.0, factor=1.6,
+                 sleep=time.sleep, clock=time.monotonic):
+    """Wait for an Assistants run to finish and return (run, seconds_waited).
+
+    Polls with a short first delay that grows by `factor` up to `max_delay`, so
+    quick answers are picked up within ~100 ms instead of a fixed 5 s sleep.
+    Tool calls are handled as soon as the run reports `requires_action`
+    (`handle_tool_calls(tool_calls)` returns the tool_outputs list) and the
+    delay is reset, since the run usually completes shortly after. Raises
+    RunFailed on a failed/expired/cancelled run and RunTimeout (after trying to
+    cancel the run) once `timeout` seconds have passed.
+
+    `client`, `sleep` and `clock` are injectable so the loop can be driven by a
+    stub client that scripts run status transitions.
+    """
+    started = clock()
+    delay = initial_delay
+    while True:
+        run = client.beta.threads.runs.retrieve(thread_id=thread_id, run_id=run_id)
+
+        if run.status == "completed":
+            return run, clock() - started
+
+        if run.status in TERMINAL_FAILURES:
+            raise RunFailed(f"Run failed with status {run.status}")
+
+        # Checked before tool calls too, so a run that keeps asking for tools still times out.
+        if clock() - started > timeout:
+            try:
+                client.beta.threads.runs.cancel(thread_id=thread_id, run_id=run_id)
+            except Exception:
+                pass
+            raise RunTimeout(f"Run {run_id} did not finish within {timeout}s (last status {run.status})")
+
+        if run.status == "requires_action":
+            tool_calls = run.required_action.submit_tool_outputs.tool_calls
+            client.beta.threads.runs.submit_tool_outputs(
+                thread_id=thread_id,
+                run_id=run_id,
+                tool_outputs=handle_tool_calls(tool_calls),
+            )
+            delay = initial_delay
+            continue
+
+        sleep(delay)
+        delay = min(max_delay, delay * factor)
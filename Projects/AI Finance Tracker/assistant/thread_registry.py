@@ -0,0 +1,92 @@
+import json
+import sqlite3
+import threading
+from pathlib import Path
+
+
+class ThreadRegistry:
+    """email -> assistant thread_id, stored in SQLite with an in-memory map in front.
+
+    Lookups are a dict hit after the first call. `get_or_create` is atomic:
+    concurrent calls for the same email in this process wait on one per-email
+    lock and share a single created thread, and across processes the primary
+    key decides the winner (the loser's new thread is discarded).
+    """
+
+    def __init__(self, path, create_thread, delete_thread=None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._create_thread = create_thread
+        self._delete_thread = delete_thread
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS user_threads (
+                email TEXT PRIMARY KEY,
+                thread_id TEXT NOT NULL
+            )
+        """)
+        self._conn.commit()
+        self._db_lock = threading.Lock()
+        self._locks_guard = threading.Lock()
+        self._email_locks = {}
+        self._cache = {}
+
+    def _lookup(self, email):
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT thread_id FROM user_threads WHERE email = ?", (email,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _lock_for(self, email):
+        with self._locks_guard:
+            return self._email_locks.setdefault(email, threading.Lock())
+
+    def get(self, email):
+        if email in self._cache:
+            return self._cache[email]
+        thread_id = self._lookup(email)
+        if thread_id is not None:
+            self._cache[email] = thread_id
+        return thread_id
+
+    def get_or_create(self, email):
+        thread_id = self.get(email)
+        if thread_id is not None:
+            return thread_id
+
+        with self._lock_for(email):
+            # Another caller may have created it while we waited for the lock.
+            thread_id = self.get(email)
+            if thread_id is not None:
+                return thread_id
+
+            new_thread_id = self._create_thread()
+            with self._db_lock:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO user_threads (email, thread_id) VALUES (?, ?)",
+                    (email, new_thread_id),
+                )
+                self._conn.commit()
+            thread_id = self._lookup(email)
+            if thread_id != new_thread_id and self._delete_thread is not None:
+                # Another process registered this email first; don't leave an orphan behind.
+                self._delete_thread(new_thread_id)
+            self._cache[email] = thread_id
+            return thread_id
+
+    def migrate_json(self, json_path):
+        """One-time import of the old user_threads.json; the file is renamed afterwards."""
+        json_path = Path(json_path)
+        if not json_path.exists():
+            return 0
+        with open(json_path, "r") as f:
+            threads = json.load(f)
+        with self._db_lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO user_threads (email, thread_id) VALUES (?, ?)",
+                list(threads.items()),
+            )
+            self._conn.commit()
+        json_path.rename(json_path.with_name(json_path.name + ".migrated"))
+        return len(threads)
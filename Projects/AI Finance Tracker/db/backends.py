@@ -0,0 +1,231 @@
+import sqlite3
+from collections import namedtuple
+from datetime import date, datetime
+from functools import lru_cache
+
+
+def rollup_insert_sql(db, where=""):
+    """INSERT ... SELECT that fills ExpenseRollups from Expenses (optionally filtered by `where`)."""
+    return f"""
+        INSERT INTO ExpenseRollups (user_email, year_number, week_number, category, total_amount, expense_count)
+        SELECT user_email, {db.year("expense_date")}, {db.week("expense_date")}, category,
+               SUM(amount), COUNT(*)
+        FROM Expenses
+        {where}
+        GROUP BY user_email, {db.year("expense_date")}, {db.week("expense_date")}, category
+    """
+
+
+class MSSQLBackend:
+    """SQL Server through pyodbc (the production database)."""
+
+    name = "mssql"
+
+    def __init__(self, config):
+        self.config = config
+
+    def connect(self):
+        import pyodbc
+        conn_str = (
+            f"DRIVER={self.config['DRIVER']};"
+            f"SERVER={self.config['SERVER']};"
+            f"DATABASE={self.config['DATABASE']};"
+            f"UID={self.config['UID']};"
+            f"PWD={self.config['PWD']};"
+        )
+        return pyodbc.connect(conn_str)
+
+    def init_schema(self, conn):
+        """Expenses itself is managed on the server; add the rollup table and indexes if missing.
+
+        The `id` column paging relies on is added by migrate_expense_id.py, not here:
+        it rewrites the table, which doesn't belong in connection setup.
+        """
+        cursor = conn.cursor()
+        # Created and filled from the existing Expenses in one batch, so users who
+        # already have history don't see empty stats after the first deploy.
+        cursor.execute(f"""
+            IF OBJECT_ID('ExpenseRollups', 'U') IS NULL
+            BEGIN
+                CREATE TABLE ExpenseRollups (
+                    user_email NVARCHAR(255) NOT NULL,
+                    year_number INT NOT NULL,
+                    week_number INT NOT NULL,
+                    category NVARCHAR(255) NOT NULL,
+                    total_amount DECIMAL(18, 2) NOT NULL,
+                    expense_count INT NOT NULL,
+                    CONSTRAINT PK_ExpenseRollups PRIMARY KEY (user_email, year_number, week_number, category)
+                );
+                {rollup_insert_sql(self)};
+            END
+        """)
+        cursor.execute("""
+            IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_Expenses_user_date')
+            CREATE INDEX IX_Expenses_user_date ON Expenses (user_email, expense_date DESC)
+                INCLUDE (category, amount)
+        """)
+        conn.commit()
+
+    def migrate_expense_id(self, conn):
+        """Give Expenses the `id` column db_manager.iter_expenses pages on; returns what was done.
+
+        A table that already has an identity column under another name gets `id`
+        as a computed alias of it (a table can only have one identity column).
+        Otherwise a new identity column numbers the existing rows.
+        """
+        cursor = conn.cursor()
+        cursor.execute("SELECT COL_LENGTH('Expenses', 'id')")
+        if cursor.fetchone()[0] is not None:
+            return "Expenses already has an id column"
+        cursor.execute("SELECT name FROM sys.identity_columns WHERE object_id = OBJECT_ID('Expenses')")
+        row = cursor.fetchone()
+        if row is not None:
+            cursor.execute(f"ALTER TABLE Expenses ADD id AS [{row[0]}]")
+            result = f"added id as an alias of the identity column {row[0]}"
+        else:
+            cursor.execute("ALTER TABLE Expenses ADD id INT IDENTITY(1, 1) NOT NULL")
+            result = "added identity column id"
+        conn.commit()
+        return result
+
+    # Adds one (user, year, week, category) delta; HOLDLOCK keeps concurrent first inserts safe.
+    UPSERT_ROLLUP_SQL = """
+        MERGE ExpenseRollups WITH (HOLDLOCK) AS t
+        USING (SELECT ? AS user_email, ? AS year_number, ? AS week_number, ? AS category,
+                      ? AS amount, ? AS cnt) AS s
+        ON t.user_email = s.user_email AND t.year_number = s.year_number
+           AND t.week_number = s.week_number AND t.category = s.category
+        WHEN MATCHED THEN
+            UPDATE SET total_amount = t.total_amount + s.amount, expense_count = t.expense_count + s.cnt
+        WHEN NOT MATCHED THEN
+            INSERT (user_email, year_number, week_number, category, total_amount, expense_count)
+            VALUES (s.user_email, s.year_number, s.week_number, s.category, s.amount, s.cnt);
+    """
+
+    def bulk_cursor(self, conn):
+        cursor = conn.cursor()
+        # Sends the whole parameter array in one round trip instead of one per row.
+        cursor.fast_executemany = True
+        return cursor
+
+    # --- dialect helpers ---
+    def top(self, n):
+        return f"TOP {int(n)}"
+
+    def limit(self, n):
+        return ""
+
+    def week(self, column):
+        return f"DATEPART(WEEK, {column})"
+
+    def year(self, column):
+        return f"DATEPART(YEAR, {column})"
+
+    def month(self, column):
+        return f"DATEPART(MONTH, {column})"
+
+    def day(self, column):
+        return f"CAST({column} AS DATE)"
+
+
+@lru_cache(maxsize=64)
+def _row_type(fields):
+    return namedtuple("Row", fields)
+
+
+def _namedtuple_row(cursor, row):
+    # Same attribute access as pyodbc rows (row.category).
+    return _row_type(tuple(col[0] for col in cursor.description))(*row)
+
+
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_adapter(datetime, datetime.isoformat)
+sqlite3.register_converter("DATE", lambda value: date.fromisoformat(value.decode()))
+
+
+class SQLiteBackend:
+    """Local SQLite file for development, tests and benchmarks."""
+
+    name = "sqlite"
+
+    def __init__(self, path):
+        self.path = path
+
+    def connect(self):
+        conn = sqlite3.connect(self.path, detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False)
+        conn.row_factory = _namedtuple_row
+        return conn
+
+    def init_schema(self, conn):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS Expenses (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_email TEXT NOT NULL,
+                category TEXT NOT NULL,
+                amount REAL NOT NULL,
+                expense_date DATE NOT NULL,
+                thread_id TEXT
+            )
+        """)
+        had_rollups = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'ExpenseRollups'").fetchone()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS ExpenseRollups (
+                user_email TEXT NOT NULL,
+                year_number INTEGER NOT NULL,
+                week_number INTEGER NOT NULL,
+                category TEXT NOT NULL,
+                total_amount REAL NOT NULL,
+                expense_count INTEGER NOT NULL,
+                PRIMARY KEY (user_email, year_number, week_number, category)
+            )
+        """)
+        if not had_rollups:
+            conn.execute(rollup_insert_sql(self))  # backfill a database created before rollups
+        conn.execute("CREATE INDEX IF NOT EXISTS IX_Expenses_user_date ON Expenses (user_email, expense_date DESC)")
+        conn.commit()
+
+    def migrate_expense_id(self, conn):
+        # Expenses is created here with an id primary key.
+        return "Expenses already has an id column"
+
+    UPSERT_ROLLUP_SQL = """
+        INSERT INTO ExpenseRollups (user_email, year_number, week_number, category, total_amount, expense_count)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT (user_email, year_number, week_number, category) DO UPDATE SET
+            total_amount = total_amount + excluded.total_amount,
+            expense_count = expense_count + excluded.expense_count
+    """
+
+    def bulk_cursor(self, conn):
+        return conn.cursor()
+
+    # --- dialect helpers ---
+    def top(self, n):
+        return ""
+
+    def limit(self, n):
+        return f"LIMIT {int(n)}"
+
+    def week(self, column):
+        # Same numbering as SQL Server's DATEPART(WEEK, ...): weeks start on Sunday
+        # and the week containing January 1st is week 1.
+        return (f"(CAST((strftime('%j', {column}) - 1 "
+                f"+ strftime('%w', date({column}, 'start of year'))) / 7 AS INTEGER) + 1)")
+
+    def year(self, column):
+        return f"CAST(strftime('%Y', {column}) AS INTEGER)"
+
+    def month(self, column):
+        return f"CAST(strftime('%m', {column}) AS INTEGER)"
+
+    def day(self, column):
+        return f"date({column})"
+
+
+def create_backend(name, db_config=None, sqlite_path=None):
+    if name == "mssql":
+        return MSSQLBackend(db_config)
+    if name == "sqlite":
+        return SQLiteBackend(sqlite_path)
+    raise ValueError(f"Unknown DB backend: {name}")
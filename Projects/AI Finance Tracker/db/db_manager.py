@@ -1,46 +1,177 @@
-import pyodbc
-from utils.config import DB_CONFIG
-
-def get_connection():
-    conn_str = (
-        f"DRIVER={DB_CONFIG['DRIVER']};"
-        f"SERVER={DB_CONFIG['SERVER']};"
-        f"DATABASE={DB_CONFIG['DATABASE']};"
-        f"UID={DB_CONFIG['UID']};"
-        f"PWD={DB_CONFIG['PWD']};"
-    )
-    return pyodbc.connect(conn_str)
+from collections import defaultdict
+from datetime import date, datetime
+from itertools import islice
+from db.backends import create_backend, rollup_insert_sql
+from db.pool import ConnectionPool
+from utils.config import DB_CONFIG, DB_BACKEND, SQLITE_PATH, DB_POOL_SIZE, DB_POOL_TIMEOUT
+
+_pool = None
+
+def get_pool():
+    """Process-wide connection pool, created on first use."""
+    global _pool
+    if _pool is None:
+        backend = create_backend(DB_BACKEND, db_config=DB_CONFIG, sqlite_path=SQLITE_PATH)
+        _pool = ConnectionPool(backend, size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT)
+    return _pool
+
+def set_pool(pool):
+    """Swap the pool (e.g. a SQLite one for tests or benchmarks)."""
+    global _pool
+    _pool = pool
+
+def connection():
+    return get_pool().connection()
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+def week_key(expense_date):
+    """(year, week) of a date, numbered like SQL Server's DATEPART(WEEK, ...)."""
+    d = _as_date(expense_date)
+    jan1_weekday = (date(d.year, 1, 1).weekday() + 1) % 7  # Sunday = 0
+    return d.year, (d.timetuple().tm_yday - 1 + jan1_weekday) // 7 + 1
+
+def _apply_rollups(cursor, expenses):
+    """Add (email, category, amount, expense_date, ...) rows to ExpenseRollups in the open transaction."""
+    deltas = defaultdict(lambda: [0.0, 0])
+    for email, category, amount, expense_date, *_ in expenses:
+        year, week = week_key(expense_date)
+        delta = deltas[(email, year, week, category)]
+        delta[0] += float(amount)
+        delta[1] += 1
+    cursor.executemany(get_pool().backend.UPSERT_ROLLUP_SQL,
+                       [(*key, total, count) for key, (total, count) in deltas.items()])
 
 def add_expense(email, category, amount, expense_date, thread_id):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO Expenses (user_email, category, amount, expense_date,thread_id)
-        VALUES (?, ?, ?, ?,?)
-    """, (email, category, amount, expense_date, thread_id))
-    conn.commit()
-    conn.close()
+    with connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO Expenses (user_email, category, amount, expense_date,thread_id)
+            VALUES (?, ?, ?, ?,?)
+        """, (email, category, amount, expense_date, thread_id))
+        # Same transaction, so the rollup never disagrees with Expenses.
+        _apply_rollups(cursor, [(email, category, amount, expense_date)])
+        conn.commit()
     return {"status": "success", "message": f"Added {amount} for {category} on {expense_date}"}
 
-def get_expense_summary(email):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-    select top 50 category,amount,expense_date, DATEPART(WEEK,expense_date) as week_number from expenses 
-        WHERE user_email  = ?
-        order by expense_date desc
-    """, (email,))
-    rows = cursor.fetchall()
-    conn.close()
+def add_expenses_bulk(rows, chunk_size=5000):
+    """Insert many expenses, committing once per chunk.
+
+    `rows` is any iterable of (email, category, amount, expense_date, thread_id)
+    tuples and is consumed lazily, so large files never sit in memory. Returns
+    the number of rows inserted. Rollups are updated in the same transaction
+    as each chunk.
+    """
+    db = get_pool().backend
+    rows = iter(rows)
+    inserted = 0
+    with connection() as conn:
+        cursor = db.bulk_cursor(conn)
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            cursor.executemany("""
+                INSERT INTO Expenses (user_email, category, amount, expense_date,thread_id)
+                VALUES (?, ?, ?, ?,?)
+            """, chunk)
+            _apply_rollups(cursor, chunk)
+            conn.commit()
+            inserted += len(chunk)
+    return inserted
+
+def _expense_filters(email, start, end, category):
+    """WHERE clause and params shared by the expense queries (start inclusive, end exclusive)."""
+    clauses, params = ["user_email = ?"], [email]
+    if start is not None:
+        clauses.append("expense_date >= ?")
+        params.append(start)
+    if end is not None:
+        clauses.append("expense_date < ?")
+        params.append(end)
+    if category is not None:
+        clauses.append("category = ?")
+        params.append(category)
+    return clauses, params
 
+def _stream(cursor, fetch_size):
+    while True:
+        rows = cursor.fetchmany(fetch_size)
+        if not rows:
+            return
+        yield from rows
+
+def iter_expenses(email, start=None, end=None, category=None, after=None, limit=None, fetch_size=500):
+    """Expenses newest first, streamed from the cursor.
+
+    Rows have id, category, amount, expense_date and week_number. For the next
+    page pass `after=(row.expense_date, row.id)` of the last row seen: keyset
+    pagination, so deep pages cost the same as the first one. The pooled
+    connection is held until the generator is exhausted or closed.
+    """
+    db = get_pool().backend
+    clauses, params = _expense_filters(email, start, end, category)
+    if after is not None:
+        after_date, after_id = after
+        clauses.append("(expense_date < ? OR (expense_date = ? AND id < ?))")
+        params += [after_date, after_date, after_id]
+    top = db.top(limit) if limit else ""
+    limit_sql = db.limit(limit) if limit else ""
+    with connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT {top} id, category, amount, expense_date, {db.week("expense_date")} AS week_number
+            FROM Expenses
+            WHERE {" AND ".join(clauses)}
+            ORDER BY expense_date DESC, id DESC {limit_sql}
+        """, params)
+        yield from _stream(cursor, fetch_size)
+
+AGGREGATES = {"sum": "SUM(amount)", "count": "COUNT(*)", "avg": "AVG(amount)"}
+
+def aggregate_expenses(email, by="week", measure="sum", start=None, end=None, category=None,
+                       by_category=False, fetch_size=500):
+    """Totals computed in the database, grouped by day, week or month, oldest first.
+
+    Yields (period, value) rows, or (period, category, value) with by_category.
+    `period` is the date for "day", (year, week) for "week" (DATEPART numbering,
+    see week_key) and (year, month) for "month". `measure` is sum, count or avg.
+    """
+    db = get_pool().backend
+    buckets = {
+        "day": [(db.day("expense_date"), "day")],
+        "week": [(db.year("expense_date"), "year_number"), (db.week("expense_date"), "week_number")],
+        "month": [(db.year("expense_date"), "year_number"), (db.month("expense_date"), "month_number")],
+    }[by]
+    group = buckets + ([("category", "category")] if by_category else [])
+    clauses, params = _expense_filters(email, start, end, category)
+    with connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT {", ".join(f"{expr} AS {alias}" for expr, alias in group)}, {AGGREGATES[measure]} AS value
+            FROM Expenses
+            WHERE {" AND ".join(clauses)}
+            GROUP BY {", ".join(expr for expr, _ in group)}
+            ORDER BY {", ".join(alias for _, alias in group)}
+        """, params)
+        for row in _stream(cursor, fetch_size):
+            period = _as_date(row[0]) if by == "day" else (row[0], row[1])
+            yield (period, *row[len(buckets):])
+
+def get_expense_summary(email, start=None, end=None, category=None, limit=50):
     result = [
         {
             "category": row.category,
             "amount": row.amount,
-            "expense_date": row.expense_date.strftime("%Y-%m-%d"),
+            "expense_date": _as_date(row.expense_date).strftime("%Y-%m-%d"),
             "week_number": row.week_number
         }
-        for row in rows
+        for row in iter_expenses(email, start=start, end=end, category=category, limit=limit)
     ]
 
     print("result is \n", result)
@@ -48,19 +179,61 @@ def get_expense_summary(email):
     return result
 
 def get_weekly_expense(email):
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT DATEPART(WEEK, expense_date) AS week_number,
-               SUM(amount) AS total_spent
-        FROM Expenses
-        WHERE user_email = ?
-        GROUP BY DATEPART(WEEK, expense_date)
-        ORDER BY week_number
-    """, (email,))
-    rows = cursor.fetchall()
-    conn.close()
+    # Reads the pre-aggregated rollup (a few rows per week) instead of scanning all expenses.
+    with connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT week_number,
+                   SUM(total_amount) AS total_spent
+            FROM ExpenseRollups
+            WHERE user_email = ?
+            GROUP BY week_number
+            ORDER BY week_number
+        """, (email,))
+        rows = cursor.fetchall()
     return {row[0]: row[1] for row in rows}
 
+def get_rollups(email, since_year):
+    """(year_number, week_number, category, total_amount, expense_count) rows from since_year on."""
+    with connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT year_number, week_number, category, total_amount, expense_count
+            FROM ExpenseRollups
+            WHERE user_email = ? AND year_number >= ?
+        """, (email, since_year))
+        return cursor.fetchall()
+
+def get_categories(email):
+    with connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT DISTINCT category FROM ExpenseRollups WHERE user_email = ?", (email,))
+        return [row[0] for row in cursor.fetchall()]
+
+def get_category_totals(email, start, end):
+    """{category: (total, count)} for expenses with start <= expense_date < end."""
+    with connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT category, SUM(amount) AS total, COUNT(*) AS n
+            FROM Expenses
+            WHERE user_email = ? AND expense_date >= ? AND expense_date < ?
+            GROUP BY category
+        """, (email, start, end))
+        return {row[0]: (float(row[1]), row[2]) for row in cursor.fetchall()}
+
+def rebuild_rollups(email=None):
+    """Recompute ExpenseRollups from Expenses, for one user or everyone (backfills, repairs)."""
+    db = get_pool().backend
+    where, params = ("WHERE user_email = ?", (email,)) if email else ("", ())
+    with connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"DELETE FROM ExpenseRollups {where}", params)
+        cursor.execute(rollup_insert_sql(db, where), params)
+        conn.commit()
 
-print(get_connection())
\ No newline at end of file
+def migrate_expense_id():
+    """Add the id column iter_expenses pages on if Expenses lacks one; returns what was done."""
+    db = get_pool().backend
+    with connection() as conn:
+        return db.migrate_expense_id(conn)
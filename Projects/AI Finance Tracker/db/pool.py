@@ -0,0 +1,112 @@
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    """Thread-safe pool of DB connections with a hard size limit.
+
+    Connections are opened lazily up to `size`. A connection that has been idle
+    longer than `health_check_after` seconds is pinged before it is handed out
+    and replaced if the ping fails. Callers use `with pool.connection() as conn:`;
+    the connection always goes back to the pool, with the transaction rolled
+    back if the block did not finish normally.
+    """
+
+    def __init__(self, backend, size=5, timeout=10.0, health_check_after=30.0):
+        self.backend = backend
+        self.size = size
+        self.timeout = timeout
+        self.health_check_after = health_check_after
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+        self._schema_ready = False
+
+    def _open(self):
+        conn = self.backend.connect()
+        if not self._schema_ready:
+            self.backend.init_schema(conn)
+            self._schema_ready = True
+        return conn
+
+    def _open_counted(self):
+        """Open a connection for a slot already counted in _opened."""
+        try:
+            return self._open()
+        except Exception:
+            with self._lock:
+                self._opened -= 1
+            raise
+
+    def _is_alive(self, conn):
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+            return True
+        except Exception:
+            return False
+
+    def _close_quietly(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _checkout(self):
+        try:
+            conn, returned_at = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._opened < self.size
+                if can_open:
+                    self._opened += 1
+            if can_open:
+                return self._open_counted()
+            try:
+                conn, returned_at = self._idle.get(timeout=self.timeout)
+            except queue.Empty:
+                raise PoolTimeout(f"No DB connection available within {self.timeout}s")
+
+        if time.monotonic() - returned_at > self.health_check_after and not self._is_alive(conn):
+            self._close_quietly(conn)
+            return self._open_counted()
+        return conn
+
+    @contextmanager
+    def connection(self):
+        conn = self._checkout()
+        healthy = True
+        try:
+            yield conn
+        except BaseException:
+            # Also covers GeneratorExit (a generator closed mid-query) and KeyboardInterrupt.
+            try:
+                conn.rollback()
+            except Exception:
+                healthy = False
+            raise
+        finally:
+            if healthy:
+                self._idle.put((conn, time.monotonic()))
+            else:
+                # Broken connection: drop it so the next caller gets a fresh one.
+                self._close_quietly(conn)
+                with self._lock:
+                    self._opened -= 1
+
+    def close(self):
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._close_quietly(conn)
+            with self._lock:
+                self._opened -= 1
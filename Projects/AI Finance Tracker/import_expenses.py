@@ -0,0 +1,112 @@
+"""Bulk import of historic expenses from a CSV or bank-statement export.
+
+    python import_expenses.py statement.csv --email me@example.com
+    python import_expenses.py export.csv --email me@example.com \
+        --date-col "Txn Date" --amount-col Debit --category-col Narration --date-format %d/%m/%Y
+    python import_expenses.py signed.csv --email me@example.com --debit-sign negative
+
+Rows are streamed from the file and inserted in chunks; a single summary message
+is posted to the user's assistant thread at the end.
+"""
+import argparse
+import csv
+from collections import Counter
+from datetime import datetime
+from db.db_manager import add_expenses_bulk
+
+
+class ImportSummary:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.skipped = 0
+        self.first_date = None
+        self.last_date = None
+        self.by_category = Counter()
+
+    def add(self, category, amount, expense_date):
+        self.count += 1
+        self.total += amount
+        self.by_category[category] += amount
+        self.first_date = min(self.first_date or expense_date, expense_date)
+        self.last_date = max(self.last_date or expense_date, expense_date)
+
+    def message(self):
+        top = ", ".join(f"{category}: ₹{amount:,.2f}" for category, amount in self.by_category.most_common(5))
+        return (f"Imported {self.count} expenses totalling ₹{self.total:,.2f} "
+                f"from {self.first_date} to {self.last_date}. Top categories: {top}")
+
+
+def parse_amount(text, debit_sign="positive"):
+    """Expense amount of a cell, or None for empty cells and credits.
+
+    With a signed amount column, `debit_sign` says which sign marks money going
+    out ("positive" or "negative"); rows with the other sign (refunds, salary)
+    are credits and are skipped. "any" imports every non-zero amount, for
+    exports whose amount column only holds debits.
+    """
+    text = (text or "").replace(",", "").replace("₹", "").strip()
+    if not text:
+        return None
+    if text.startswith("(") and text.endswith(")"):
+        text = "-" + text[1:-1]  # accounting style (123.00) is negative
+    amount = float(text)
+    if (debit_sign == "positive" and amount < 0) or (debit_sign == "negative" and amount > 0):
+        return None
+    return abs(amount)
+
+
+def read_expenses(path, email, thread_id, args, summary):
+    """Yield insert tuples from the CSV, skipping rows without a usable amount or date."""
+    with open(path, newline="", encoding=args.encoding) as f:
+        for row in csv.DictReader(f):
+            try:
+                amount = parse_amount(row.get(args.amount_col), args.debit_sign)
+                expense_date = datetime.strptime(row[args.date_col].strip(), args.date_format).date()
+            except (KeyError, ValueError, AttributeError):
+                # AttributeError: short row, the date column is None
+                amount = None
+            if not amount:
+                summary.skipped += 1
+                continue
+            category = (row.get(args.category_col) or "uncategorized").strip() or "uncategorized"
+            summary.add(category, amount, expense_date)
+            yield (email, category, amount, expense_date, thread_id)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Bulk import expenses from CSV")
+    arg_parser.add_argument("csv_file")
+    arg_parser.add_argument("--email", required=True)
+    arg_parser.add_argument("--date-col", default="date")
+    arg_parser.add_argument("--amount-col", default="amount")
+    arg_parser.add_argument("--category-col", default="category")
+    arg_parser.add_argument("--date-format", default="%Y-%m-%d")
+    arg_parser.add_argument("--encoding", default="utf-8-sig")
+    arg_parser.add_argument("--chunk-size", type=int, default=5000)
+    arg_parser.add_argument("--debit-sign", choices=["positive", "negative", "any"], default="positive",
+                            help="sign of expenses in a signed amount column; rows with the other "
+                                 "sign are credits and skipped ('any' imports every amount)")
+    arg_parser.add_argument("--no-thread-message", action="store_true",
+                            help="do not post the import summary to the assistant thread")
+    args = arg_parser.parse_args()
+
+    thread_id = None
+    if not args.no_thread_message:
+        from assistant.thread_manager import client, get_or_create_thread
+        thread_id = get_or_create_thread(args.email)
+
+    summary = ImportSummary()
+    started = datetime.now()
+    inserted = add_expenses_bulk(read_expenses(args.csv_file, args.email, thread_id, args, summary),
+                                 chunk_size=args.chunk_size)
+    elapsed = (datetime.now() - started).total_seconds()
+    print(f"Inserted {inserted} rows in {elapsed:.1f}s ({summary.skipped} skipped)")
+
+    if inserted and thread_id:
+        client.beta.threads.messages.create(thread_id=thread_id, role="user", content=summary.message())
+        print("Posted summary to thread", thread_id)
+
+
+if __name__ == "__main__":
+    main()
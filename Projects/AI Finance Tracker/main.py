@@ -1,9 +1,29 @@
 import streamlit as st
 import matplotlib.pyplot as plt
+import uuid
 from datetime import date
+from io import BytesIO
 from assistant.thread_manager import get_or_create_thread
-from assistant.functions import add_expense_fn, get_summary_fn, get_weekly_stats_fn
+from assistant.functions import add_expense_fn, answer_question_fn, get_weekly_stats_fn
 from utils.config import ASSISTANT_ID
+from utils.cache import user_cache
+
+def render_weekly_chart(weekly_data):
+    """Draw the weekly scatter plot once and return it as PNG bytes."""
+    weeks = list(weekly_data.keys())
+    totals = list(weekly_data.values())
+
+    plt.style.use('seaborn-v0_8')
+    fig, ax = plt.subplots()
+    ax.scatter(weeks, totals,s=100,c='red',edgecolors='none')
+    ax.set_xlabel("Week Number",fontsize=14)
+    ax.set_ylabel("Total Spent (₹)",fontsize=14)
+    ax.set_title("Weekly Expense Summary",fontsize=24)
+
+    buffer = BytesIO()
+    fig.savefig(buffer, format="png", bbox_inches="tight")
+    plt.close(fig)
+    return buffer.getvalue()
 
 st.title("AI Personal Finance Tracker")
 
@@ -15,6 +35,10 @@ if user_email:
     st.write(f"Your session thread: {thread_id}")
 
     # --- Expense form ---
+    # One token per rendered form: a replayed submit of the same render is ignored,
+    # while the next expense gets a fresh token.
+    if "expense_submit_id" not in st.session_state:
+        st.session_state.expense_submit_id = uuid.uuid4().hex
     with st.form("add_expense_form"):
         category = st.text_input("Category (groceries, transport, etc.)")
         amount = st.number_input("Amount", min_value=0.0)
@@ -26,30 +50,28 @@ if user_email:
             "category": category,
             "amount": amount,
             "date": expense_date,
-            "thread_id" : thread_id
+            "thread_id" : thread_id,
+            "submit_id": st.session_state.expense_submit_id
             })
+            st.session_state.expense_submit_id = uuid.uuid4().hex
             st.success(result["message"])
 
 
     # --- Chat with assistant (placeholder for function calling integration) ---
     user_message = st.text_input("Ask your finance assistant anything:")
     if user_message:
-        assistant_response = get_summary_fn({"email": user_email,"thread_id":thread_id,"user_message":user_message,"ASSISTANT_ID":ASSISTANT_ID})
+        # Totals, top categories, averages and week-over-week questions are answered
+        # from the DB directly; everything else goes to the assistant.
+        assistant_response = answer_question_fn({"email": user_email,"thread_id":thread_id,"user_message":user_message,"ASSISTANT_ID":ASSISTANT_ID})
         # TODO: Call OpenAI assistant with thread_id and function calling
         st.write(f"Assistant response for: {assistant_response}")
 
     # --- Weekly stats visualization ---
+    # Stats and chart are cached per user and only rebuilt after add_expense_fn writes.
     weekly_data = get_weekly_stats_fn({"email": user_email})
     if weekly_data:
-        weeks = list(weekly_data.keys())
-        totals = list(weekly_data.values())
-
-        fig, ax = plt.subplots()
-        plt.style.use('seaborn-v0_8')
-        ax.scatter(weeks, totals,s=100,c='red',edgecolors='none')
-        ax.set_xlabel("Week Number",fontsize=14)
-        ax.set_ylabel("Total Spent (₹)",fontsize=14)
-        ax.set_title("Weekly Expense Summary",fontsize=24)
-        st.pyplot(fig)
+        chart = user_cache.get_or_compute(user_email, "weekly_chart",
+                                          lambda: render_weekly_chart(weekly_data))
+        st.image(chart)
     else:
         st.write("No expenses found to plot.")
@@ -0,0 +1,24 @@
+"""Add the id column that expense paging (db_manager.iter_expenses) relies on.
+
+    python migrate_expense_id.py
+
+Run once against an Expenses table created before paging existed. On SQL
+Server this may rewrite the table to number existing rows, so run it in a
+maintenance window rather than during traffic. Safe to re-run.
+"""
+import argparse
+import time
+from db.db_manager import migrate_expense_id
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Add the Expenses id column used for paging")
+    arg_parser.parse_args()
+
+    started = time.perf_counter()
+    result = migrate_expense_id()
+    print(f"{result} ({time.perf_counter() - started:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+"""Rebuild the ExpenseRollups table from Expenses.
+
+    python rebuild_rollups.py                     # everyone
+    python rebuild_rollups.py --email me@example.com
+
+Run after loading data outside the app (direct SQL, restores) or to repair rollups.
+"""
+import argparse
+import time
+from db.db_manager import rebuild_rollups
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Rebuild weekly/category expense rollups")
+    arg_parser.add_argument("--email", help="only rebuild this user's rollups")
+    args = arg_parser.parse_args()
+
+    started = time.perf_counter()
+    rebuild_rollups(args.email)
+    print(f"Rollups rebuilt for {args.email or 'all users'} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
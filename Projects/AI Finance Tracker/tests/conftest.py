@@ -0,0 +1,38 @@
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from db import db_manager  # noqa: E402
+from db.backends import create_backend  # noqa: E402
+from db.pool import ConnectionPool  # noqa: E402
+
+TODAY = date(2026, 10, 18)  # a Sunday: first day of week 43
+
+
+@pytest.fixture
+def pool(tmp_path):
+    """A SQLite-backed pool installed as db_manager's pool for the test."""
+    backend = create_backend("sqlite", sqlite_path=str(tmp_path / "finance.db"))
+    pool = ConnectionPool(backend, size=2, timeout=1)
+    db_manager.set_pool(pool)
+    with pool.connection() as conn:
+        backend.init_schema(conn)
+    yield pool
+    db_manager.set_pool(None)
+    pool.close()
+
+
+@pytest.fixture
+def expenses(pool):
+    """A few weeks of expenses for me@example.com."""
+    rows = []
+    for days_ago in range(60):
+        day = TODAY - timedelta(days=days_ago)
+        rows.append(("me@example.com", "Groceries", 10.0, day, None))
+        rows.append(("me@example.com", "Transport", 5.0, day, None))
+    db_manager.add_expenses_bulk(rows)
+    return rows
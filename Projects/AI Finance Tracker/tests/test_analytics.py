@@ -0,0 +1,63 @@
+import pytest
+
+from assistant import analytics
+from conftest import TODAY
+
+EMAIL = "me@example.com"
+
+
+@pytest.mark.parametrize("question", [
+    "how much did i spend on uber this week",
+    "how much did i spend on food last month",
+    "how much money do i have left",
+    "why am i spending so much",
+    # Comparisons other than week over week, and questions naming two periods.
+    "how does my spending this month compare to last month",
+    "how does my spending this week compared to last year",
+    "how much more did i spend this month than last month",
+    "what did i spend today and yesterday",
+    # About single expenses, not category totals.
+    "what was my biggest expense this month",
+    "what are my most expensive purchases",
+    # More than one thing to total.
+    "how much did i spend on coffee and groceries",
+    "how much did i spend on groceries and transport this month",
+])
+def test_unanswerable_questions_go_to_the_assistant(expenses, question):
+    assert analytics.answer(EMAIL, question, TODAY) is None
+
+
+def test_total_for_a_known_category(expenses):
+    answer = analytics.answer(EMAIL, "how much did i spend on groceries this week", TODAY)
+    assert answer == "You spent ₹10.00 on Groceries this week across 1 expense(s)."
+
+
+def test_total_for_all_categories(expenses):
+    answer = analytics.answer(EMAIL, "what did i spend last week", TODAY)
+    assert answer == "You spent ₹105.00 in total last week across 14 expense(s)."
+
+
+@pytest.mark.parametrize("question", [
+    "what are my top categories this month",
+    "which category did i spend the most on this month",
+])
+def test_top_categories_in_either_word_order(expenses, question):
+    answer = analytics.answer(EMAIL, question, TODAY)
+    assert answer.startswith("Your top spending categories this month: Groceries ₹180.00")
+
+
+def test_week_over_week_change(expenses):
+    answer = analytics.answer(EMAIL, "how does my spending this week compare to last week", TODAY)
+    assert answer == "You spent ₹15.00 in total this week vs ₹105.00 last week (-86%)."
+
+
+@pytest.mark.parametrize("question, unit", [
+    ("average daily spending this week", "day"),
+    ("what is my average weekly spending this month", "week"),
+    ("average spending per month this year", "month"),
+    ("average spending this week", "day"),
+])
+def test_average_unit_comes_from_the_unit_word_not_the_period(question, unit):
+    intent = analytics.parse_intent(question, ["Groceries", "Transport"], TODAY)
+    assert intent["kind"] == "average"
+    assert intent["unit"] == unit
@@ -0,0 +1,43 @@
+from datetime import timedelta
+
+from db import db_manager
+from conftest import TODAY
+
+EMAIL = "me@example.com"
+
+
+def test_closing_a_partly_read_generator_returns_the_connection(pool, expenses):
+    for _ in range(pool.size * 3):
+        rows = db_manager.iter_expenses(EMAIL)
+        next(rows)
+        rows.close()
+    assert pool._opened <= pool.size
+    assert pool._idle.qsize() == pool._opened
+    # Would raise PoolTimeout if a slot had leaked.
+    assert len(db_manager.get_expense_summary(EMAIL)) == 50
+
+
+def test_keyset_pages_match_a_full_scan(expenses):
+    everything = [row.id for row in db_manager.iter_expenses(EMAIL, category="Groceries")]
+    paged, after = [], None
+    while True:
+        page = list(db_manager.iter_expenses(EMAIL, category="Groceries", after=after, limit=7))
+        if not page:
+            break
+        paged += [row.id for row in page]
+        after = (page[-1].expense_date, page[-1].id)
+    assert paged == everything
+    assert len(everything) == 60
+
+
+def test_weekly_sums_match_the_rollups(expenses):
+    weekly = dict(db_manager.aggregate_expenses(EMAIL, by="week", start=TODAY - timedelta(days=59)))
+    rollups = {}
+    for year, week, _, total, _ in db_manager.get_rollups(EMAIL, since_year=TODAY.year):
+        rollups[(year, week)] = rollups.get((year, week), 0) + total
+    assert weekly == rollups
+
+
+def test_daily_count_by_category(expenses):
+    rows = list(db_manager.aggregate_expenses(EMAIL, by="day", measure="count", start=TODAY, by_category=True))
+    assert rows == [(TODAY, "Groceries", 1), (TODAY, "Transport", 1)]
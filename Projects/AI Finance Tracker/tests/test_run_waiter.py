@@ -0,0 +1,94 @@
+from types import SimpleNamespace
+
+import pytest
+
+from assistant.run_waiter import RunFailed, RunTimeout, wait_for_run
+
+
+class FakeClock:
+    """Time only moves when the waiter sleeps (or a stub call takes `call_cost`)."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class ScriptedRuns:
+    """Stands in for client.beta.threads.runs; each retrieve returns the next scripted status."""
+
+    def __init__(self, statuses, clock, call_cost=0.0):
+        self.statuses = list(statuses)
+        self.clock = clock
+        self.call_cost = call_cost
+        self.submitted = []
+        self.cancelled = False
+
+    def retrieve(self, thread_id, run_id):
+        self.clock.now += self.call_cost
+        status = self.statuses.pop(0) if len(self.statuses) > 1 else self.statuses[0]
+        tool_call = SimpleNamespace(id="call_1", function=SimpleNamespace(name="get_expense_summary"))
+        return SimpleNamespace(
+            id=run_id, status=status,
+            required_action=SimpleNamespace(submit_tool_outputs=SimpleNamespace(tool_calls=[tool_call])),
+        )
+
+    def submit_tool_outputs(self, thread_id, run_id, tool_outputs):
+        self.submitted.append(tool_outputs)
+
+    def cancel(self, thread_id, run_id):
+        self.cancelled = True
+
+
+def make_client(runs):
+    return SimpleNamespace(beta=SimpleNamespace(threads=SimpleNamespace(runs=runs)))
+
+
+def answer_tools(tool_calls):
+    return [{"tool_call_id": call.id, "output": "context"} for call in tool_calls]
+
+
+def test_queued_then_tool_call_then_completed():
+    clock = FakeClock()
+    runs = ScriptedRuns(["queued", "in_progress", "requires_action", "in_progress", "completed"], clock)
+    run, waited = wait_for_run(make_client(runs), "thread", "run", answer_tools,
+                               sleep=clock.sleep, clock=clock)
+    assert run.status == "completed"
+    assert runs.submitted == [[{"tool_call_id": "call_1", "output": "context"}]]
+    # Backoff grows, and restarts from the initial delay after the tool outputs go in.
+    assert clock.sleeps == pytest.approx([0.1, 0.16, 0.1])
+    assert waited == pytest.approx(0.36)
+
+
+def test_timeout_cancels_the_run():
+    clock = FakeClock()
+    runs = ScriptedRuns(["in_progress"], clock)
+    with pytest.raises(RunTimeout):
+        wait_for_run(make_client(runs), "thread", "run", answer_tools, timeout=5,
+                     sleep=clock.sleep, clock=clock)
+    assert runs.cancelled
+    assert max(clock.sleeps) == 2.0
+
+
+def test_run_that_keeps_requiring_action_still_times_out():
+    clock = FakeClock()
+    runs = ScriptedRuns(["requires_action"], clock, call_cost=1.0)
+    with pytest.raises(RunTimeout):
+        wait_for_run(make_client(runs), "thread", "run", answer_tools, timeout=5,
+                     sleep=clock.sleep, clock=clock)
+    assert runs.cancelled
+    assert len(runs.submitted) == 5
+
+
+def test_failed_status_raises():
+    clock = FakeClock()
+    runs = ScriptedRuns(["queued", "failed"], clock)
+    with pytest.raises(RunFailed, match="failed"):
+        wait_for_run(make_client(runs), "thread", "run", answer_tools, sleep=clock.sleep, clock=clock)
+    assert not runs.cancelled
@@ -0,0 +1,55 @@
+import threading
+from collections import OrderedDict
+
+
+class UserCache:
+    """In-process cache of per-user derived data (stats, charts, ...).
+
+    Streamlit reruns the whole script on every interaction; values cached here
+    survive those reruns and are only recomputed after `invalidate(email)`,
+    which every write path for that user must call. Each invalidation bumps the
+    user's generation; a value computed across an invalidation is returned but
+    not stored, since it may have been read before the write.
+
+    Values that also depend on something besides the user's writes (e.g. the
+    current day) pass a `version`: the entry is reused only while the version
+    matches, and replaced otherwise, so there is one entry per key. Keys that
+    come from user input (chat questions) are bounded by keeping only the
+    `max_entries` most recently used entries per user.
+    """
+
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self._data = {}
+        self._generations = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, email, key, compute, version=None):
+        with self._lock:
+            entries = self._data.get(email)
+            entry = entries.get(key) if entries is not None else None
+            if entry is not None and entry[0] == version:
+                entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self._generations.get(email, 0)
+        value = compute()
+        with self._lock:
+            if self._generations.get(email, 0) == generation:
+                entries = self._data.setdefault(email, OrderedDict())
+                entries[key] = (version, value)
+                entries.move_to_end(key)
+                while len(entries) > self.max_entries:
+                    entries.popitem(last=False)
+        return value
+
+    def invalidate(self, email):
+        with self._lock:
+            self._data.pop(email, None)
+            self._generations[email] = self._generations.get(email, 0) + 1
+
+
+user_cache = UserCache()
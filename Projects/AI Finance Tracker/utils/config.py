@@ -16,10 +16,23 @@ DB_CONFIG = {
     "PWD": "your password here"
 }
 
+# ----------------------
+# Database backend & pool
+# ----------------------
+DB_BACKEND = os.getenv("DB_BACKEND", "mssql")   # "mssql" or "sqlite"
+SQLITE_PATH = os.getenv("SQLITE_PATH", "data/finance.db")
+DB_POOL_SIZE = 5
+DB_POOL_TIMEOUT = 10  # seconds to wait for a free connection
+
 # ----------------------
 # Paths
 # ----------------------
-USER_THREAD_FILE = "data/user_threads.json"
+OUTBOX_DB = "data/outbox.db"   # queued assistant thread messages
+USER_THREAD_DB = "data/user_threads.db"
+USER_THREAD_FILE = "data/user_threads.json"   # legacy store, migrated into USER_THREAD_DB on startup
+
 
+CONTEXT_TOKEN_BUDGET = 600  # max tokens of spending context put in assistant prompts
+RUN_TIMEOUT_SECONDS = 60  # give up on an assistant run after this long
 
 ASSISTANT_ID = "your assistant ID here" #Generated by running assistant_one_time.py once
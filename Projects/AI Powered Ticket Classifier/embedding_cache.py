@@ -0,0 +1,97 @@
+import hashlib
+import sqlite3
+import unicodedata
+from collections import OrderedDict
+import numpy as np
+
+
+def normalize_text(text: str) -> str:
+    """Fold cosmetic differences (case, curly quotes, spacing, trailing punctuation) so repeats share a key."""
+    text = unicodedata.normalize("NFKC", text).replace("’", "'").replace("‘", "'")
+    return " ".join(text.lower().split()).strip(" .!?")
+
+
+def make_key(text: str, model: str) -> str:
+    return hashlib.sha256(f"{model}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """Query embeddings keyed by normalized text + embedding model.
+
+    Lookups go to an in-memory LRU of `memory_size` vectors first, then to a
+    SQLite file, so repeated tickets are routed without calling the API, also
+    across restarts. Vectors are stored as float32 blobs.
+    """
+
+    def __init__(self, path="embedding_cache.sqlite", memory_size=2048):
+        self.memory_size = memory_size
+        self._memory = OrderedDict()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                vector BLOB NOT NULL
+            )
+        """)
+        self.conn.commit()
+
+    def _remember(self, key, vector):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def get(self, text: str, model: str):
+        key = make_key(text, model)
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return self._memory[key]
+        row = self.conn.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        vector = np.frombuffer(row[0], dtype=np.float32)
+        self._remember(key, vector)
+        self.disk_hits += 1
+        return vector
+
+    def set_many(self, texts, vectors, model: str):
+        rows = []
+        for text, vector in zip(texts, vectors):
+            key = make_key(text, model)
+            vector = np.asarray(vector, dtype=np.float32)
+            self._remember(key, vector)
+            rows.append((key, model, vector.tobytes()))
+        self.conn.executemany("INSERT OR REPLACE INTO embeddings (key, model, vector) VALUES (?, ?, ?)", rows)
+        self.conn.commit()
+
+    def embed(self, texts, embedding_model, model: str, batch_size: int = 100):
+        """Embeddings for `texts` in order; only cache misses (deduplicated) are sent to the model."""
+        vectors = [self.get(text, model) for text in texts]
+        # The normalized text is what gets embedded, so every variant of a ticket maps to one vector
+        missing = list(dict.fromkeys(normalize_text(t) for t, v in zip(texts, vectors) if v is None))
+        fresh = {}
+        for start in range(0, len(missing), batch_size):
+            batch = missing[start:start + batch_size]
+            embedded = embedding_model.embed_documents(batch)
+            self.set_many(batch, embedded, model)
+            fresh.update(zip(batch, embedded))
+        return [v if v is not None else np.asarray(fresh[normalize_text(t)], dtype=np.float32)
+                for t, v in zip(texts, vectors)]
+
+    def stats(self):
+        total = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / total if total else 0.0,
+        }
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,79 @@
+import hashlib
+import json
+import os
+import numpy as np
+
+MANIFEST = "manifest.json"
+FORMAT_VERSION = 1
+
+
+def routes_hash(descriptions, model: str) -> str:
+    """Identifies one set of route vectors: the model plus the ordered description texts."""
+    payload = json.dumps([FORMAT_VERSION, model, list(descriptions)], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _read_manifest(directory):
+    try:
+        with open(os.path.join(directory, MANIFEST), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def load_route_embeddings(descriptions, embedding_model, model: str, directory="route_embeds"):
+    """Unit-length route vectors (routes x dims float32), memory-mapped from `directory`.
+
+    The manifest records the model, the descriptions and their hash. If either
+    changed since the store was written, only new or edited descriptions are
+    embedded again; rows for unchanged descriptions are copied over. Each
+    version gets its own .npy file and the manifest is swapped in last, so a
+    crash mid-rebuild never pairs a manifest with the wrong vectors.
+    """
+    descriptions = list(descriptions)
+    content_hash = routes_hash(descriptions, model)
+    manifest = _read_manifest(directory)
+    if manifest and manifest.get("content_hash") == content_hash:
+        path = os.path.join(directory, manifest["file"])
+        if os.path.exists(path):
+            return np.load(path, mmap_mode="r")
+
+    # Reuse vectors for descriptions that were already embedded with the same model
+    reusable = {}
+    if manifest and manifest.get("model") == model:
+        old_path = os.path.join(directory, manifest["file"])
+        if os.path.exists(old_path):
+            old = np.load(old_path)
+            reusable = {text: old[i] for i, text in enumerate(manifest["descriptions"])}
+
+    missing = [text for text in descriptions if text not in reusable]
+    if missing:
+        print(f"🔄 Embedding {len(missing)} changed route description(s)")
+        fresh = np.asarray(embedding_model.embed_documents(missing), dtype=np.float32)
+        fresh /= np.linalg.norm(fresh, axis=1, keepdims=True)
+        reusable.update(zip(missing, fresh))
+    matrix = np.ascontiguousarray(np.stack([reusable[text] for text in descriptions]), dtype=np.float32)
+
+    os.makedirs(directory, exist_ok=True)
+    file_name = f"routes-{content_hash[:16]}.npy"
+    np.save(os.path.join(directory, file_name), matrix)
+    tmp = os.path.join(directory, MANIFEST + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({
+            "version": FORMAT_VERSION,
+            "model": model,
+            "descriptions": descriptions,
+            "content_hash": content_hash,
+            "dims": int(matrix.shape[1]),
+            "file": file_name,
+        }, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, os.path.join(directory, MANIFEST))
+
+    # Older versions are no longer referenced by the manifest
+    for name in os.listdir(directory):
+        if name.startswith("routes-") and name.endswith(".npy") and name != file_name:
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass  # still mapped by another process (Windows); removed on a later rebuild
+    return np.load(os.path.join(directory, file_name), mmap_mode="r")
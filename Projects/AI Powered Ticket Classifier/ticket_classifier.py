@@ -12,8 +12,8 @@ from langchain_community.utils.math import cosine_similarity
 from pydantic import BaseModel, Field
 from pprint import pprint
 import numpy as np
-import os
-import pickle
+from embedding_cache import EmbeddingCache
+from route_store import load_route_embeddings
 
 # ============================================
 # 🔹 Step 1: Load environment variables
@@ -96,26 +96,22 @@ chain_descriptions = ["login issue", "bug logging and tracking", "data extractio
 
 embedding_model = OpenAIEmbeddings()
 
+# Repeated tickets reuse their query embedding (memory LRU + embedding_cache.sqlite)
+query_cache = EmbeddingCache("embedding_cache.sqlite")
+
 # --- Normalize helper ---
 def normalize(vec):
     return vec / np.linalg.norm(vec)
 
-# --- Load or cache embeddings ---
-if os.path.exists("chain_embeds.pkl"):
-    with open("chain_embeds.pkl", "rb") as f:
-        chain_embeds = pickle.load(f)
-else:
-    raw_embeds = embedding_model.embed_documents(chain_descriptions)
-    chain_embeds = [normalize(e) for e in raw_embeds]
-    with open("chain_embeds.pkl", "wb") as f:
-        pickle.dump(chain_embeds, f)
+# --- Load route embeddings (memory-mapped; re-embeds only routes that changed) ---
+chain_embeds = load_route_embeddings(chain_descriptions, embedding_model, embedding_model.model)
 
 # ============================================
 # 🔹 Step 8: Router function
 # ============================================
 def route_request(user_request: str, confidence_threshold: float = 0.75):
-    # Generate embedding for user query
-    query_emb = normalize(embedding_model.embed_query(user_request))
+    # Generate embedding for user query (cached)
+    query_emb = normalize(query_cache.embed([user_request], embedding_model, embedding_model.model)[0])
     
     # Compute cosine similarity
     similarity_scores = cosine_similarity([query_emb], chain_embeds)[0]
@@ -141,7 +137,64 @@ def route_request(user_request: str, confidence_threshold: float = 0.75):
     }
 
 # ============================================
-# 🔹 Step 9: Test Run
+# 🔹 Step 9: Batch router (bursts of tickets)
+# ============================================
+def route_batch(user_requests, confidence_threshold: float = 0.75,
+                embed_batch_size: int = 100, max_concurrency: int = 8):
+    """Route many tickets at once; results come back in input order.
+
+    Tickets are embedded `embed_batch_size` at a time, scored against every
+    route in one matrix product, and each route's tickets go through that
+    chain's `batch` with at most `max_concurrency` LLM calls in flight.
+    """
+    user_requests = list(user_requests)
+    if not user_requests:
+        return []
+
+    # Only cache misses are embedded, in batched calls
+    raw = query_cache.embed(user_requests, embedding_model, embedding_model.model, batch_size=embed_batch_size)
+    query_embs = np.array(raw, dtype=np.float32)
+    query_embs /= np.linalg.norm(query_embs, axis=1, keepdims=True)
+
+    # tickets x routes cosine similarity (both sides are unit vectors)
+    scores = query_embs @ chain_embeds.T
+    best_indexes = scores.argmax(axis=1)
+    best_scores = scores[np.arange(len(user_requests)), best_indexes]
+
+    results = [None] * len(user_requests)
+    groups = {}
+    for i, (best_index, best_score) in enumerate(zip(best_indexes, best_scores)):
+        if best_score < confidence_threshold:
+            results[i] = fallback_chain(user_requests[i])
+        else:
+            groups.setdefault(int(best_index), []).append(i)
+
+    for best_index, positions in groups.items():
+        responses = router_chains[best_index].batch(
+            [{"user_request": user_requests[i]} for i in positions],
+            config={"max_concurrency": max_concurrency},
+            return_exceptions=True,
+        )
+        for i, response in zip(positions, responses):
+            if isinstance(response, Exception):
+                # One bad LLM reply shouldn't fail the whole burst
+                print(f"⚠️ Chain failed for ticket {i}: {response}")
+                results[i] = fallback_chain(user_requests[i])
+            else:
+                results[i] = {
+                    "selected_chain": chain_descriptions[best_index],
+                    "confidence": float(best_scores[i]),
+                    "response": response
+                }
+
+    print(f"✅ Routed {len(user_requests)} tickets: "
+          + ", ".join(f"{chain_descriptions[k]}={len(v)}" for k, v in groups.items())
+          + f", fallback={len(user_requests) - sum(len(v) for v in groups.values())}")
+    print(f"📦 Embedding cache: {query_cache.stats()}")
+    return results
+
+# ============================================
+# 🔹 Step 10: Test Run
 # ============================================
 
 if __name__ == "__main__":
@@ -157,3 +210,6 @@ if __name__ == "__main__":
         result = route_request(req)
         pprint(result)
         print("-" * 80)
+
+    # Same tickets in one batch
+    pprint(route_batch(test_requests))
@@ -0,0 +1,90 @@
+"""Micro-benchmark for extractor.extract_fields.
+
+Runs the precompiled, early-exit extractor and the old on-the-fly regex calls over a
+corpus of card HTML and prints the per-snippet cost of each.
+
+    python benchmarks/bench_extractor.py --corpus saved_cards/ --repeat 5
+
+--corpus points at a directory of saved card snippets (*.html, one card per file).
+Without it a synthetic corpus of Shopping-like cards is generated.
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from extractor import extract_fields  # noqa: E402
+
+CARD_TEMPLATE = (
+    '<div class="card"><a href="/shopping/product/{n}" title="{title}">'
+    '<div class="img"><img src="https://encrypted-tbn{a}.gstatic.com/shopping?q=tbn:{tok1}"></div>'
+    '<span class="seller">{filler}</span><span class="price">{symbol}{price}</span>'
+    '<img src="https://encrypted-tbn{b}.gstatic.com/favicon-tbn?q=tbn%3A{tok2}"></a>'
+    '<div class="details">{filler}</div></div>'
+)
+
+
+def synthetic_corpus(size: int, seed: int = 0):
+    rng = random.Random(seed)
+    symbols = ["₹", "$", "€", "£", "Rs. "]
+    corpus = []
+    for n in range(size):
+        filler = " ".join(f'<span data-x="{rng.random():.6f}">seller {rng.randint(1, 999)}</span>'
+                          for _ in range(rng.randint(5, 40)))
+        corpus.append(CARD_TEMPLATE.format(
+            n=n, title=f"Product {n} {rng.choice(['128 GB', '256 GB', 'Black', 'Blue'])}",
+            a=rng.randint(0, 3), b=rng.randint(0, 3),
+            tok1="".join(rng.choices("abcdefABCDEF0123456789", k=80)),
+            tok2="".join(rng.choices("abcdefABCDEF0123456789", k=80)),
+            symbol=rng.choice(symbols), price=f"{rng.randint(100, 199999):,}", filler=filler,
+        ))
+    return corpus
+
+
+def load_corpus(directory: str):
+    return [p.read_text(encoding="utf-8") for p in sorted(Path(directory).glob("*.html"))]
+
+
+def legacy_extract(html: str):
+    """The previous approach: three scans with patterns looked up on every call."""
+    price_match = re.search(r'(₹|[$])\s*([\d,]+)', html)
+    price = int(price_match.group(2).replace(",", "")) if price_match else None
+    title_match = re.search(r'title="([^"]+)"', html)
+    title = title_match.group(1) if title_match else None
+    img_urls = re.findall(r'src="(https://encrypted[^"]+)"', html)[:3]
+    return {"title": title, "price": price, "img_urls": img_urls}
+
+
+def bench(fn, corpus, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for html in corpus:
+            fn(html)
+        best = min(best, time.perf_counter() - start)
+    return best / len(corpus)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--corpus", help="directory of saved card *.html files")
+    arg_parser.add_argument("--size", type=int, default=20000, help="synthetic corpus size")
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus else synthetic_corpus(args.size)
+    if not corpus:
+        sys.exit("No snippets found in corpus")
+    avg_bytes = sum(len(html) for html in corpus) / len(corpus)
+    print(f"{len(corpus)} snippets, {avg_bytes:.0f} chars on average, best of {args.repeat}")
+
+    for name, fn in [("legacy (on the fly)", legacy_extract), ("precompiled, early-exit", extract_fields)]:
+        per_snippet = bench(fn, corpus, args.repeat)
+        print(f"{name:<24} {per_snippet * 1e6:8.2f} µs/snippet")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Stand-in for llm_parser.llm that answers from the prompt after a fixed latency.
+
+    import llm_parser
+    llm_parser.llm = FakeChatModel(latency=0.8)
+
+It understands both prompts in llm_parser: the single-card prompt (a dict of
+cleaned data followed by format instructions) and the numbered batch prompt,
+and echoes the cleaned data back as the JSON the real model would return.
+"""
+import ast
+import asyncio
+import json
+import re
+import time
+
+_NUMBERED_LINE = re.compile(r"^(\d+): (\{.*\})$", re.MULTILINE)
+_SINGLE_DATA = re.compile(r"partial extracted product data:\n(\{.*?\})\n", re.DOTALL)
+
+
+class FakeChatModel:
+    """Implements the predict/apredict surface used by llm_parser."""
+
+    def __init__(self, latency=0.5, latency_per_1k_chars=0.0):
+        self.latency = latency
+        self.latency_per_1k_chars = latency_per_1k_chars
+        self.calls = 0
+        self.prompt_chars = 0
+
+    def _delay(self, text):
+        return self.latency + self.latency_per_1k_chars * len(text) / 1000
+
+    def _answer(self, text):
+        self.calls += 1
+        self.prompt_chars += len(text)
+        numbered = _NUMBERED_LINE.findall(text)
+        if numbered:
+            items = []
+            for index, data in numbered:
+                item = json.loads(data)
+                item["index"] = int(index)
+                items.append(item)
+            return json.dumps(items)
+        match = _SINGLE_DATA.search(text)
+        data = ast.literal_eval(match.group(1)) if match else {}
+        return json.dumps({key: data.get(key) for key in ["title", "price", "img_urls"]})
+
+    def predict(self, text, **kwargs):
+        time.sleep(self._delay(text))
+        return self._answer(text)
+
+    async def apredict(self, text, **kwargs):
+        await asyncio.sleep(self._delay(text))
+        return self._answer(text)
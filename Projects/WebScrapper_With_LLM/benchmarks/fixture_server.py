@@ -0,0 +1,138 @@
+"""Local HTTP server that serves Google Shopping-like pages for offline benchmarks.
+
+    python benchmarks/fixture_server.py --port 8765
+
+GET /shopping          search page with a textarea[name=q] that submits on Enter
+GET /search?q=...      results page with `g-inner-card[jscontroller]` cards
+GET /static/...        filler stylesheet, font and image bytes (what lean mode blocks)
+
+Cards are generated deterministically from the query, so repeated queries return
+the same cards (useful for cache benchmarks).
+"""
+import argparse
+import hashlib
+import html
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+SEARCH_PAGE = """<!doctype html>
+<html><head><title>Shopping</title>
+<link rel="stylesheet" href="/static/style.css"></head>
+<body>
+<form action="/search" method="get">
+  <textarea name="q"></textarea>
+</form>
+<script>
+  const box = document.querySelector("textarea[name='q']");
+  box.addEventListener("keydown", e => {
+    if (e.key === "Enter") { e.preventDefault(); box.form.submit(); }
+  });
+</script>
+</body></html>"""
+
+CARD = """<g-inner-card jscontroller="fx{n}" class="card">
+  <a href="/product/{n}" title="{title}">
+    <div class="thumb"><img src="https://encrypted-tbn{a}.gstatic.com/shopping?q=tbn:{token}"></div>
+    <div class="name">{title}</div>
+    <div class="price">{price}</div>
+    <img src="https://encrypted-tbn{b}.gstatic.com/favicon-tbn?q=tbn%3A{token}">
+  </a>
+  <div class="filler">{filler}</div>
+</g-inner-card>"""
+
+
+def render_cards(query: str, count: int, incomplete_every: int = 0):
+    """Deterministic cards for a query; every `incomplete_every`-th card has no price."""
+    seed = int(hashlib.sha256(query.lower().encode("utf-8")).hexdigest(), 16)
+    cards = []
+    for n in range(count):
+        value = seed >> (n * 8)
+        price = "" if incomplete_every and n % incomplete_every == incomplete_every - 1 \
+            else f"₹{10000 + value % 90000:,}"
+        cards.append(CARD.format(
+            n=n, title=html.escape(f"{query} variant {n}", quote=True), price=price,
+            a=value % 4, b=(value >> 2) % 4, token=f"{seed % 10**12:x}{n}",
+            filler="".join(f'<span data-k="{k}">seller {k}</span>' for k in range(20)),
+        ))
+    return cards
+
+
+def make_handler(cards_per_page, page_delay, incomplete_every, static_kb):
+    static_body = b"x" * (static_kb * 1024)
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send(self, body: bytes, content_type: str):
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == "/shopping":
+                self._send(SEARCH_PAGE.encode("utf-8"), "text/html; charset=utf-8")
+            elif url.path == "/search":
+                if page_delay:
+                    time.sleep(page_delay)
+                query = parse_qs(url.query).get("q", [""])[0]
+                cards = "\n".join(render_cards(query, cards_per_page, incomplete_every))
+                page = ('<!doctype html><html><head><link rel="stylesheet" href="/static/style.css">'
+                        '<link rel="preload" as="font" href="/static/font.woff2" crossorigin>'
+                        f'</head><body><img src="/static/banner.png">{cards}</body></html>')
+                self._send(page.encode("utf-8"), "text/html; charset=utf-8")
+            elif url.path.startswith("/static/"):
+                content_type = {"css": "text/css", "png": "image/png"}.get(
+                    url.path.rsplit(".", 1)[-1], "application/octet-stream")
+                self._send(static_body, content_type)
+            else:
+                self.send_error(404)
+
+    return Handler
+
+
+class FixtureServer:
+    """Runs the fixture server on a background thread: `with FixtureServer() as url: ...`."""
+
+    def __init__(self, port=0, cards_per_page=20, page_delay=0.0, incomplete_every=0, static_kb=200):
+        handler = make_handler(cards_per_page, page_delay, incomplete_every, static_kb)
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def shopping_url(self):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}/shopping"
+
+    def __enter__(self):
+        self.thread.start()
+        return self.shopping_url
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Serve Shopping-like fixture pages")
+    arg_parser.add_argument("--port", type=int, default=8765)
+    arg_parser.add_argument("--cards", type=int, default=20)
+    arg_parser.add_argument("--page-delay", type=float, default=0.0, help="seconds per results page")
+    arg_parser.add_argument("--incomplete-every", type=int, default=0,
+                            help="drop the price from every Nth card (0 = never)")
+    args = arg_parser.parse_args()
+
+    with FixtureServer(args.port, args.cards, args.page_delay, args.incomplete_every) as url:
+        print("Serving", url)
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
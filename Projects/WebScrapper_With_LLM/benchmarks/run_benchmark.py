@@ -0,0 +1,137 @@
+"""Offline throughput benchmark for the main.py pipeline.
+
+Runs the real pipeline (browser pool, scraper, extraction, cache, CSV writer)
+against benchmarks/fixture_server.py and benchmarks/fake_llm.py, so nothing
+talks to Google or OpenAI. Playwright's Chromium still has to be installed.
+
+    python benchmarks/run_benchmark.py --rows 200 --scrape-workers 4 --llm-workers 8
+    python benchmarks/run_benchmark.py --rows 200 --lean --in-browser --unique 50
+
+Reports rows/sec, p50/p95 latency per stage, LLM calls and max RSS. With
+--trace-memory the peak Python heap is measured in a second, untimed run.
+"""
+import argparse
+import asyncio
+import csv
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("OPENAI_API_KEY", "offline-benchmark")
+
+import llm_parser  # noqa: E402
+import main as pipeline  # noqa: E402
+from cache import ExtractionCache  # noqa: E402
+from output_writer import StreamingCsvWriter  # noqa: E402
+from rate_limiter import HostRateLimiter  # noqa: E402
+from fake_llm import FakeChatModel  # noqa: E402
+from fixture_server import FixtureServer  # noqa: E402
+
+# Image URLs in the fixture cards point at gstatic; fail those lookups instantly.
+OFFLINE_LAUNCH_ARGS = ["--host-resolver-rules=MAP *.gstatic.com ~NOTFOUND"]
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def write_input(path, rows, unique):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Product", "Price"])
+        for i in range(rows):
+            writer.writerow([f"Fixture Phone {i % unique} 128 GB", 10000 + i % 90000])
+
+
+async def run_once(args, trace_memory=False):
+    """One pipeline run; returns (seconds, rows written, fake LLM, timings, peak python heap or None)."""
+    fake_llm = FakeChatModel(latency=args.llm_latency)
+    llm_parser.llm = fake_llm
+
+    with tempfile.TemporaryDirectory() as tmp, \
+            FixtureServer(cards_per_page=args.cards, page_delay=args.page_delay,
+                          incomplete_every=args.incomplete_every) as shopping_url:
+        input_file = os.path.join(tmp, "input.csv")
+        write_input(input_file, args.rows, args.unique or args.rows)
+        cache = None if args.no_cache else ExtractionCache(os.path.join(tmp, "cache.sqlite"))
+        writer = StreamingCsvWriter(os.path.join(tmp, "output.csv"), os.path.join(tmp, "output.checkpoint"))
+        timings = defaultdict(list)
+        scrape_options = {
+            "lean": args.lean,
+            "in_browser": args.in_browser,
+            "base_url": shopping_url,
+            "rate_limiter": HostRateLimiter(rate=1e6, burst=10**6),
+        }
+
+        if trace_memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+        await pipeline.run_pipeline(
+            input_file, writer, args.scrape_workers, args.llm_workers, args.queue_size, args.top_n,
+            headless=True, cache=cache, fast_path=not args.no_fast_path,
+            scrape_options=scrape_options, timings=timings, launch_args=OFFLINE_LAUNCH_ARGS,
+        )
+        elapsed = time.perf_counter() - started
+        peak_python = None
+        if trace_memory:
+            peak_python = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        writer.close()
+        if cache is not None:
+            cache.close()
+    return elapsed, writer.rows_written, fake_llm, timings, peak_python
+
+
+async def run(args):
+    # tracemalloc hooks every allocation and would slow the stages being timed,
+    # so the timed run goes without it and the heap peak comes from a second pass.
+    elapsed, rows_written, fake_llm, timings, _ = await run_once(args)
+
+    print(f"rows: {args.rows} in {elapsed:.2f}s -> {args.rows / elapsed:.2f} rows/sec "
+          f"({rows_written} products written)")
+    for stage in ["scrape", "extract"]:
+        values = timings[stage]
+        print(f"{stage:<8} n={len(values):<5} p50={percentile(values, 50) * 1000:8.1f} ms "
+              f"p95={percentile(values, 95) * 1000:8.1f} ms")
+    print(f"llm calls: {fake_llm.calls}, prompt chars: {fake_llm.prompt_chars}")
+    print(f"max RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MiB")
+
+    if args.trace_memory:
+        peak_python = (await run_once(args, trace_memory=True))[4]
+        print(f"peak python heap (separate traced run): {peak_python / 1024 / 1024:.1f} MiB")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Offline benchmark for the scraping pipeline")
+    arg_parser.add_argument("--rows", type=int, default=50)
+    arg_parser.add_argument("--unique", type=int, default=0, help="distinct queries (0 = all distinct)")
+    arg_parser.add_argument("--top-n", type=int, default=pipeline.TOP_N)
+    arg_parser.add_argument("--cards", type=int, default=20, help="cards per fixture results page")
+    arg_parser.add_argument("--page-delay", type=float, default=0.2, help="fixture page latency, seconds")
+    arg_parser.add_argument("--incomplete-every", type=int, default=3,
+                            help="every Nth fixture card has no price and needs the LLM")
+    arg_parser.add_argument("--llm-latency", type=float, default=0.5, help="fake LLM latency, seconds")
+    arg_parser.add_argument("--scrape-workers", type=int, default=pipeline.SCRAPE_WORKERS)
+    arg_parser.add_argument("--llm-workers", type=int, default=pipeline.LLM_WORKERS)
+    arg_parser.add_argument("--queue-size", type=int, default=pipeline.QUEUE_SIZE)
+    arg_parser.add_argument("--lean", action="store_true")
+    arg_parser.add_argument("--in-browser", action="store_true")
+    arg_parser.add_argument("--no-cache", action="store_true")
+    arg_parser.add_argument("--no-fast-path", action="store_true")
+    arg_parser.add_argument("--trace-memory", action="store_true",
+                            help="also measure peak Python heap in a second, untimed run")
+    asyncio.run(run(arg_parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
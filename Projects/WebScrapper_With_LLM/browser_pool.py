@@ -0,0 +1,146 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from playwright.async_api import async_playwright
+
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+              "(KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36")
+
+
+class _Slot:
+    """One browser context, the browser it belongs to and how many times it has been handed out."""
+
+    def __init__(self, context, browser):
+        self.context = context
+        self.browser = browser
+        self.uses = 0
+        self.broken = False
+
+
+class BrowserPool:
+    """Keeps a few warm Chromium contexts alive and shares them between scrapes.
+
+    `size` contexts are created up front on a single browser. Callers borrow one
+    with `async with pool.page() as page:`; at most `size` callers hold a context
+    at once, the rest wait. A context is recycled after `max_uses` borrows or as
+    soon as it fails a health check.
+    """
+
+    def __init__(self, size=2, headless=False, max_uses=50, user_agent=USER_AGENT, launch_args=None):
+        self.size = size
+        self.headless = headless
+        self.max_uses = max_uses
+        self.user_agent = user_agent
+        self.launch_args = launch_args or []
+        self._playwright = None
+        self._browser = None
+        self._idle = None
+        self._lock = asyncio.Lock()
+        self._wait_times = []
+        self.recycled = 0
+
+    async def start(self):
+        if self._browser is not None:
+            return self
+        self._playwright = await async_playwright().start()
+        await self._launch_browser()
+        self._idle = asyncio.Queue()
+        for _ in range(self.size):
+            self._idle.put_nowait(await self._new_slot())
+        return self
+
+    async def close(self):
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def _launch_browser(self):
+        self._browser = await self._playwright.chromium.launch(headless=self.headless, args=self.launch_args)
+
+    async def _new_slot(self):
+        async with self._lock:
+            # The whole browser can die (crash, OOM); relaunch it before handing out contexts.
+            if not self._browser.is_connected():
+                await self._launch_browser()
+            context = await self._browser.new_context(user_agent=self.user_agent)
+        return _Slot(context, self._browser)
+
+    def _is_healthy(self, slot):
+        return (not slot.broken
+                and slot.uses < self.max_uses
+                # Contexts made on a browser that has since been relaunched are dead too.
+                and slot.browser is self._browser
+                and slot.browser.is_connected())
+
+    async def _recycle(self, slot):
+        try:
+            await slot.context.close()
+        except Exception:
+            pass
+        self.recycled += 1
+        return await self._new_slot()
+
+    @asynccontextmanager
+    async def context(self):
+        """Borrow a browser context; it goes back to the pool on exit."""
+        if self._idle is None:
+            await self.start()
+
+        started = time.perf_counter()
+        slot = await self._idle.get()
+        self._wait_times.append(time.perf_counter() - started)
+
+        try:
+            if not self._is_healthy(slot):
+                slot = await self._recycle(slot)
+            slot.uses += 1
+            yield slot.context
+        except Exception:
+            slot.broken = True
+            raise
+        finally:
+            self._idle.put_nowait(slot)
+
+    @asynccontextmanager
+    async def page(self):
+        """Borrow a context and open a fresh page on it; the page is closed on exit."""
+        async with self.context() as context:
+            page = await context.new_page()
+            try:
+                yield page
+            finally:
+                await page.close()
+
+    def wait_stats(self):
+        """Summary of how long callers waited to get a context, in seconds."""
+        waits = sorted(self._wait_times)
+        if not waits:
+            return {"acquired": 0, "avg_wait": 0.0, "p95_wait": 0.0, "max_wait": 0.0,
+                    "recycled": self.recycled}
+        return {
+            "acquired": len(waits),
+            "avg_wait": sum(waits) / len(waits),
+            "p95_wait": waits[min(len(waits) - 1, int(len(waits) * 0.95))],
+            "max_wait": waits[-1],
+            "recycled": self.recycled,
+        }
+
+
+_default_pool = None
+
+
+def get_default_pool():
+    """Pool used by scrape_google_product when the caller does not pass one."""
+    global _default_pool
+    if _default_pool is None:
+        _default_pool = BrowserPool()
+    return _default_pool
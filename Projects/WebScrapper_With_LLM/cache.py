@@ -0,0 +1,114 @@
+import hashlib
+import json
+import sqlite3
+import time
+from models import ProductInfo
+
+
+def _normalize(value):
+    """Normalize cleaned data so cosmetic differences map to the same key."""
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in sorted(value.items())}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def make_key(cleaned_data: dict, model: str, prompt_version: str) -> str:
+    payload = json.dumps([_normalize(cleaned_data), model, prompt_version],
+                         sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ExtractionCache:
+    """SQLite cache of extracted ProductInfo keyed by content hash.
+
+    Entries older than `ttl_seconds` are treated as misses. When the table grows
+    past `max_entries`, the least recently used entries are evicted. Access
+    times of hits are kept in memory and written in one transaction on evict,
+    close or every `FLUSH_EVERY` hits, so a hit costs no commit.
+    """
+
+    EVICT_EVERY = 100
+    FLUSH_EVERY = 500
+
+    def __init__(self, path="extraction_cache.sqlite", ttl_seconds=7 * 24 * 3600, max_entries=50000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._accessed = {}
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS extractions (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_extractions_accessed ON extractions (accessed)")
+        self.conn.commit()
+
+    def get(self, key: str):
+        row = self.conn.execute(
+            "SELECT value, created FROM extractions WHERE key = ?", (key,)
+        ).fetchone()
+        now = time.time()
+        if row is None or now - row[1] > self.ttl_seconds:
+            if row is not None:
+                self.conn.execute("DELETE FROM extractions WHERE key = ?", (key,))
+                self.conn.commit()
+            self.misses += 1
+            return None
+        self._accessed[key] = now
+        if len(self._accessed) >= self.FLUSH_EVERY:
+            self.flush_access_times()
+        self.hits += 1
+        return ProductInfo(**json.loads(row[0]))
+
+    def set(self, key: str, product_info: ProductInfo):
+        now = time.time()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO extractions (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+            (key, json.dumps(product_info.dict(), ensure_ascii=False), now, now),
+        )
+        self.conn.commit()
+        self._writes += 1
+        if self._writes % self.EVICT_EVERY == 0:
+            self.evict()
+
+    def flush_access_times(self):
+        if not self._accessed:
+            return
+        self.conn.executemany("UPDATE extractions SET accessed = ? WHERE key = ?",
+                              [(accessed, key) for key, accessed in self._accessed.items()])
+        self.conn.commit()
+        self._accessed.clear()
+
+    def evict(self):
+        """Drop least recently used entries beyond max_entries."""
+        self.flush_access_times()
+        count = self.conn.execute("SELECT COUNT(*) FROM extractions").fetchone()[0]
+        if count > self.max_entries:
+            self.conn.execute("""
+                DELETE FROM extractions WHERE key IN (
+                    SELECT key FROM extractions ORDER BY accessed ASC LIMIT ?
+                )
+            """, (count - self.max_entries,))
+            self.conn.commit()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    def close(self):
+        self.evict()
+        self.conn.close()
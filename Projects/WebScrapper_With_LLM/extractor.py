@@ -0,0 +1,78 @@
+import re
+from itertools import islice
+
+# Field patterns for a Google Shopping card, compiled once at import. Each field
+# stops at its first match (images after MAX_IMAGES), so a card is never scanned
+# past the point where everything we need has been found. The price scan looks
+# for the currency literal (fast literal-prefix search) and then reads the amount
+# right after it ("₹69,900", "EUR 899,00") or right before it ("899,00 €").
+CURRENCY_SYMBOLS = {
+    "₹": "INR", "Rs.": "INR", "Rs": "INR", "INR": "INR",
+    "$": "USD", "US$": "USD", "USD": "USD",
+    "€": "EUR", "EUR": "EUR",
+    "£": "GBP", "GBP": "GBP",
+}
+_CURRENCY = "|".join(re.escape(c) for c in sorted(CURRENCY_SYMBOLS, key=len, reverse=True))
+# Digits with "." / "," separators, or a (narrow) no-break space before a group of three
+# ("1 299,00" in French formatting). Which separator is decimal is decided in _parse_amount.
+_AMOUNT = r"\d+(?:(?:[.,]|[\u00a0\u202f](?=\d{3}))\d+)*"
+
+TITLE_PATTERN = re.compile(r'title="([^"]+)"')
+IMAGE_PATTERN = re.compile(r'src="(https://encrypted[^"]+)"')
+# Letter codes must not be part of a word ("EUROPE", "Bars"); the check on the left
+# side is done in _find_price, a lookbehind here would disable the literal search.
+CURRENCY_PATTERN = re.compile(rf'(?:{_CURRENCY})(?![A-Za-z])')
+AMOUNT_AFTER = re.compile(rf'\s*({_AMOUNT})')
+AMOUNT_BEFORE = re.compile(rf'(?<![\d.,])({_AMOUNT})\s*$')
+AMOUNT_BEFORE_WINDOW = 32
+
+MAX_IMAGES = 3
+
+
+def _parse_amount(amount: str) -> int:
+    """Whole units of an amount in any of the usual separator conventions.
+
+    The last separator is the decimal point when both "." and "," occur
+    ("1.299,00", "1,299.00") or when it occurs once and is followed by one or
+    two digits ("899,00", "9.99"); otherwise separators group thousands
+    ("69,900", "1,49,900", "1.299"). Decimals are dropped.
+    """
+    amount = amount.replace("\u00a0", "").replace("\u202f", "")
+    last = max(amount.rfind("."), amount.rfind(","))
+    if last != -1:
+        decimals = len(amount) - last - 1
+        if ("." in amount and "," in amount) or (amount.count(amount[last]) == 1 and decimals <= 2):
+            amount = amount[:last]
+    return int(amount.replace(".", "").replace(",", ""))
+
+
+def _find_price(text: str):
+    """(price, currency code) of the first currency-marked amount in text, or (None, None)."""
+    for match in CURRENCY_PATTERN.finditer(text):
+        if match.start() and text[match.start() - 1].isalpha() and match.group(0)[0].isalpha():
+            continue
+        amount = AMOUNT_AFTER.match(text, match.end())
+        if amount is None:
+            amount = AMOUNT_BEFORE.search(text, max(0, match.start() - AMOUNT_BEFORE_WINDOW), match.start())
+        if amount is not None:
+            return _parse_amount(amount.group(1)), CURRENCY_SYMBOLS[match.group(0)]
+    return None, None
+
+
+def extract_fields(html: str, max_images: int = MAX_IMAGES) -> dict:
+    """Return title, price, currency and up to `max_images` image URLs of a card snippet."""
+    title_match = TITLE_PATTERN.search(html)
+    price, currency = _find_price(html)
+    img_urls = [m.group(1) for m in islice(IMAGE_PATTERN.finditer(html), max_images)]
+
+    return {
+        "title": title_match.group(1) if title_match else None,
+        "price": price,
+        "currency": currency,
+        "img_urls": img_urls,
+    }
+
+
+def extract_price(text: str):
+    """Extract price from text like ₹69,900, $1,299, €1.299,00 or 899,00 €."""
+    return _find_price(text)[0]
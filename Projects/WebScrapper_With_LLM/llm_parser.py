@@ -2,14 +2,22 @@ from langchain.chat_models import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
 from langchain.output_parsers import PydanticOutputParser
 from models import ProductInfo
-from utils import extract_price
+from cache import make_key
+from extractor import extract_fields, extract_price
+import json
+import random
 import re
+from collections import Counter
 from dotenv import load_dotenv
 
 
 load_dotenv()
 
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+MODEL_NAME = "gpt-4o-mini"
+# Bump whenever the prompts or the ProductInfo model change so cached results are not reused.
+PROMPT_VERSION = "1"
+
+llm = ChatOpenAI(model=MODEL_NAME, temperature=0)
 
 parser = PydanticOutputParser(pydantic_object=ProductInfo)
 prompt = ChatPromptTemplate.from_messages([
@@ -18,52 +26,197 @@ prompt = ChatPromptTemplate.from_messages([
              "{format_instructions}")
 ])
 
-def clean_product_data(html: str):
-    """Extract key hints from HTML using regex."""
-    # Price
-    price = None
-    price_match = re.search(r'(₹|[$])\s*([\d,]+)', html)
-    if price_match:
-        price = int(price_match.group(2).replace(",", ""))
-
-    # Extract the value inside title=""
-    title_match = re.search(r'title="([^"]+)"', html)
-    title = title_match.group(1) if title_match else None
-
-
-    # Description fallback
-    #desc_match = re.search(r'<div[^>]+class="[^"]*description[^"]*"[^>]*>(.*?)</div>', html, re.DOTALL|re.#IGNORECASE)
-    #description = desc_match.group(1).strip() if desc_match else title
-
-    # Images
-    img_matches = re.findall(r'src="(https://encrypted[^"]+)"', html)
-    img_urls = img_matches[:3] if img_matches else []
+# Batch extraction: many snippets share one request and one (short) format instruction.
+BATCH_SIZE = 10
+batch_prompt = ChatPromptTemplate.from_messages([
+    ("system", "You are a product data extractor. Extract structured product info."),
+    ("user", "Below are {count} numbered product cards, one JSON object per line:\n"
+             "{numbered_data}\n\n"
+             "Return only a JSON array with one object per card, in any order: "
+             '[{{"index": <card number>, "title": str|null, "price": int|null, "img_urls": [str]}}]')
+])
 
+def clean_product_data(html: str):
+    """Extract key hints from HTML in a single precompiled-regex pass."""
+    fields = extract_fields(html)
     return {
-        "title": title,
-        #"description": description,
-        "price": price,
-        "img_urls": img_urls
+        "title": fields["title"],
+        "price": fields["price"],
+        "img_urls": fields["img_urls"]
     }
 
-def extract_product_info(html_snippet: str, expected_price: int = None):
-    cleaned_data = clean_product_data(html_snippet)
-    input_data = {
-        "cleaned_data": cleaned_data,
-        "format_instructions": parser.get_format_instructions()
+def clean_card(card):
+    """Cleaned data for a card given as raw HTML or as fields extracted in the browser.
+
+    Browser-extracted cards carry their HTML only when a field was missing; the
+    regex pass over it fills whatever the browser could not find.
+    """
+    if isinstance(card, str):
+        return clean_product_data(card)
+    cleaned_data = {
+        "title": card.get("title"),
+        "price": extract_price(card["price_text"]) if card.get("price_text") else None,
+        "img_urls": list(card.get("img_urls") or [])
     }
+    if card.get("html"):
+        for key, value in clean_product_data(card["html"]).items():
+            if not cleaned_data[key]:
+                cleaned_data[key] = value
+    return cleaned_data
 
-    llm_response_text = llm.predict(prompt.format_prompt(**input_data).to_string())
-    product_info = parser.parse(llm_response_text)
+def _build_prompt(cleaned_data):
+    return prompt.format_prompt(
+        cleaned_data=cleaned_data,
+        format_instructions=parser.get_format_instructions()
+    ).to_string()
 
+def _finalize(product_info: ProductInfo, cleaned_data: dict, expected_price: int = None):
     # Fallback to cleaned data if missing
     for key in ["title","price","img_urls"]:
         if not getattr(product_info, key) and cleaned_data.get(key):
             setattr(product_info, key, cleaned_data[key])
 
     # Price match
-    product_info.isPriceMatch = False
-    if expected_price and product_info.price and expected_price == product_info.price:
-        product_info.isPriceMatch = True
+    product_info.isPriceMatch = is_price_match(product_info.price, expected_price)
 
     return product_info
+
+def is_price_match(price, expected_price):
+    return bool(expected_price and price and expected_price == price)
+
+def extract_product_info(html_snippet: str, expected_price: int = None):
+    cleaned_data = clean_product_data(html_snippet)
+    llm_response_text = llm.predict(_build_prompt(cleaned_data))
+    product_info = parser.parse(llm_response_text)
+    return _finalize(product_info, cleaned_data, expected_price)
+
+def _build_batch_prompt(cleaned_items):
+    numbered_data = "\n".join(
+        f"{i}: {json.dumps(item, ensure_ascii=False)}" for i, item in enumerate(cleaned_items)
+    )
+    return batch_prompt.format_prompt(count=len(cleaned_items), numbered_data=numbered_data).to_string()
+
+def _parse_batch(text: str, count: int):
+    """Map card index -> ProductInfo for every item that parses; bad items are left out."""
+    text = re.sub(r"^```(?:json)?|```$", "", text.strip()).strip()
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        return {}
+    if isinstance(data, dict):
+        data = data.get("items", [])
+
+    parsed = {}
+    for item in data if isinstance(data, list) else []:
+        try:
+            index = int(item.pop("index"))
+            if 0 <= index < count and index not in parsed:
+                parsed[index] = ProductInfo(**item)
+        except (AttributeError, KeyError, TypeError, ValueError):
+            continue
+    return parsed
+
+def _cache_key(cleaned_data):
+    return make_key(cleaned_data, MODEL_NAME, PROMPT_VERSION)
+
+# Fast path: cards whose regex output is already complete skip the LLM.
+FAST_PATH_THRESHOLD = 1.0
+fast_path_stats = Counter()
+
+def score_cleaned_data(cleaned_data: dict) -> float:
+    """Confidence (0..1) that the regex output is a complete, well formed ProductInfo."""
+    title = cleaned_data.get("title")
+    price = cleaned_data.get("price")
+    img_urls = cleaned_data.get("img_urls") or []
+    checks = [
+        isinstance(title, str) and len(title.strip()) >= 3 and "<" not in title,
+        isinstance(price, int) and price > 0,
+        bool(img_urls) and all(url.startswith("https://") for url in img_urls),
+    ]
+    return sum(checks) / len(checks)
+
+def _prepare(html_snippets, cache, fast_path, audit_rate):
+    """Resolve what we can without the LLM.
+
+    Returns the cleaned data, a result list (None where the LLM must run), the
+    indexes to send to the LLM and the fast-path indexes sampled for audit.
+    """
+    cleaned_items = [clean_card(card) for card in html_snippets]
+    results = [None] * len(cleaned_items)
+    audit = set()
+    for i, cleaned_data in enumerate(cleaned_items):
+        if fast_path and score_cleaned_data(cleaned_data) >= FAST_PATH_THRESHOLD:
+            results[i] = ProductInfo(**cleaned_data)
+            fast_path_stats["bypassed"] += 1
+            if audit_rate and random.random() < audit_rate:
+                audit.add(i)
+        elif cache is not None:
+            results[i] = cache.get(_cache_key(cleaned_data))
+
+    pending = [i for i, product_info in enumerate(results) if product_info is None]
+    fast_path_stats["escalated"] += len(pending)
+    return cleaned_items, results, pending + sorted(audit), audit
+
+def _record(i, product_info, cleaned_items, results, audit, cache):
+    product_info = _finalize(product_info, cleaned_items[i])
+    if i in audit:
+        # Compare what the LLM says with what the fast path already emitted.
+        fast = results[i]
+        same = all(getattr(fast, key) == getattr(product_info, key) for key in ["title", "price", "img_urls"])
+        fast_path_stats["audited"] += 1
+        fast_path_stats["audit_match" if same else "audit_mismatch"] += 1
+        return
+    results[i] = product_info
+    if cache is not None:
+        cache.set(_cache_key(cleaned_items[i]), product_info)
+
+def _extraction_steps(html_snippets, expected_price, batch_size, cache, fast_path, audit_rate):
+    """The batch/retry loop shared by the sync and async entry points.
+
+    A generator that yields each prompt to send and receives the LLM's reply
+    via send(); it returns the finished ProductInfo list.
+    """
+    cleaned_items, results, to_llm, audit = _prepare(html_snippets, cache, fast_path, audit_rate)
+
+    for start in range(0, len(to_llm), batch_size):
+        chunk = to_llm[start:start + batch_size]
+        batch_text = yield _build_batch_prompt([cleaned_items[i] for i in chunk])
+        parsed = _parse_batch(batch_text, len(chunk))
+        for pos, i in enumerate(chunk):
+            product_info = parsed.get(pos)
+            if product_info is None:
+                product_info = parser.parse((yield _build_prompt(cleaned_items[i])))
+            _record(i, product_info, cleaned_items, results, audit, cache)
+
+    return [_finalize(product_info, cleaned, expected_price)
+            for product_info, cleaned in zip(results, cleaned_items)]
+
+def extract_product_infos(html_snippets, expected_price: int = None, batch_size: int = BATCH_SIZE,
+                          cache=None, fast_path: bool = True, audit_rate: float = 0.0):
+    """Extract many cards with one LLM call per `batch_size` snippets.
+
+    `html_snippets` may hold raw card HTML or the dicts returned by the scraper's
+    in-browser mode. Results are returned in input order. Cards whose regex data
+    scores FAST_PATH_THRESHOLD are emitted without the LLM (a sample of
+    `audit_rate` of them is still checked against it); cached cards skip the LLM
+    as well. A card whose entry is missing or malformed in the batch reply is
+    retried on its own.
+    """
+    steps = _extraction_steps(html_snippets, expected_price, batch_size, cache, fast_path, audit_rate)
+    try:
+        prompt_text = next(steps)
+        while True:
+            prompt_text = steps.send(llm.predict(prompt_text))
+    except StopIteration as done:
+        return done.value
+
+async def aextract_product_infos(html_snippets, expected_price: int = None, batch_size: int = BATCH_SIZE,
+                                 cache=None, fast_path: bool = True, audit_rate: float = 0.0):
+    """Async variant of extract_product_infos; does not block the event loop on LLM calls."""
+    steps = _extraction_steps(html_snippets, expected_price, batch_size, cache, fast_path, audit_rate)
+    try:
+        prompt_text = next(steps)
+        while True:
+            prompt_text = steps.send(await llm.apredict(prompt_text))
+    except StopIteration as done:
+        return done.value
@@ -1,33 +1,205 @@
+import argparse
 import asyncio
 import csv
-from scraper import scrape_google_product
-from llm_parser import extract_product_info
+import time
+from collections import defaultdict
+from browser_pool import BrowserPool
+from cache import ExtractionCache
+from scraper import SHOPPING_URL, ScrapeMetrics, scrape_google_product
+import llm_parser
+from llm_parser import aextract_product_infos, is_price_match
+from output_writer import StreamingCsvWriter
+from rate_limiter import HostRateLimiter
+from query_planner import QueryPlanner
 
-async def main():
-    input_file = "input.csv"
-    output_file = "output.csv"
+# Pipeline defaults
+SCRAPE_WORKERS = 2
+LLM_WORKERS = 4
+QUEUE_SIZE = 20
+TOP_N = 3
+HEADLESS = True
+MAX_USES_PER_CONTEXT = 50
+CACHE_PATH = "extraction_cache.sqlite"
+CACHE_TTL_SECONDS = 7 * 24 * 3600
+CACHE_MAX_ENTRIES = 50000
+CHECKPOINT_SUFFIX = ".checkpoint"
+RATE_PER_HOST = 0.5  # requests per second
+BURST_PER_HOST = 2
 
-    products = []
-    # Read input.csv
+def read_rows(input_file, writer):
+    """Yield (row_index, query, expected_price) for every unfinished input row."""
     with open(input_file, newline="", encoding="utf-8") as f:
         reader = csv.DictReader(f)
-        for row in reader:
+        for index, row in enumerate(reader):
+            if writer.is_completed(index):
+                continue
             query = row["Product"]
             expected_price = int(row["Price"]) if row.get("Price") else None
+            yield index, query, expected_price
+
+async def plan_rows(input_file, scrape_queue, n_scrapers, writer, planner):
+    """Stage 1: stream input rows and push a QueryGroup the first time its query shows up.
+
+    Later near-duplicates join the group while it is in flight, or are written
+    straight from its products once it has finished.
+    """
+    for index, query, expected_price in read_rows(input_file, writer):
+        group, is_new = planner.group_for(query)
+        if group.done:
+            _write_rows(writer, [(index, expected_price)], group.products)
+            continue
+        group.rows.append((index, expected_price))
+        if is_new:
+            await scrape_queue.put(group)
+    print(f"Planned {planner.rows_seen} input rows as {planner.groups_planned} scrapes")
+    for _ in range(n_scrapers):
+        await scrape_queue.put(None)
+
+def _write_rows(writer, rows, products):
+    """Write (row_index, expected_price) rows; products=None marks them failed."""
+    for index, expected_price in rows:
+        if products is None:
+            writer.finish(index, [], ok=False)
+        else:
+            writer.finish(index, [{**product, "isPriceMatch": is_price_match(product["price"], expected_price)}
+                                  for product in products])
+
+def _finish_group(writer, planner, group, products=None):
+    planner.finish(group, products)
+    _write_rows(writer, group.rows, products)
+    group.rows = []
+
+async def scrape_worker(pool, scrape_queue, llm_queue, top_n, writer, planner, scrape_options, timings):
+    """Stage 2: scrape a query once and hand its card snippets to the LLM stage."""
+    while True:
+        group = await scrape_queue.get()
+        if group is None:
+            return
+        started = time.perf_counter()
+        try:
+            html_snippets = await scrape_google_product(group.query, top_n=top_n, pool=pool, **scrape_options)
+        except Exception as e:
+            print(f"Scrape failed for {group.query!r}: {e}")
+            _finish_group(writer, planner, group)
+            continue
+        finally:
+            timings["scrape"].append(time.perf_counter() - started)
+        await llm_queue.put((group, html_snippets))
+
+async def llm_worker(llm_queue, writer, planner, timings, cache=None, fast_path=True, audit_rate=0.0):
+    """Stage 3: extract a query's cards once and fan them out to every row that asked for it."""
+    while True:
+        item = await llm_queue.get()
+        if item is None:
+            return
+        group, html_snippets = item
+        started = time.perf_counter()
+        try:
+            product_infos = await aextract_product_infos(html_snippets, cache=cache,
+                                                         fast_path=fast_path, audit_rate=audit_rate)
+        except Exception as e:
+            print(f"Extraction failed for {group.query!r}: {e}")
+            _finish_group(writer, planner, group)
+            continue
+        finally:
+            timings["extract"].append(time.perf_counter() - started)
+        _finish_group(writer, planner, group, [product_info.dict() for product_info in product_infos])
+
+async def run_pipeline(input_file, writer, scrape_workers=SCRAPE_WORKERS, llm_workers=LLM_WORKERS,
+                       queue_size=QUEUE_SIZE, top_n=TOP_N, headless=HEADLESS, cache=None,
+                       fast_path=True, audit_rate=0.0, scrape_options=None, timings=None,
+                       launch_args=None):
+    """Plan -> scrape -> extract with bounded queues; rows stream to `writer` in input order.
+
+    Per-item stage latencies are appended to `timings["scrape"]` / `timings["extract"]`
+    when a dict of lists is passed.
+    """
+    scrape_queue = asyncio.Queue(maxsize=queue_size)
+    llm_queue = asyncio.Queue(maxsize=queue_size)
+    scrape_options = scrape_options or {}
+    timings = timings if timings is not None else defaultdict(list)
+
+    async with BrowserPool(size=scrape_workers, headless=headless,
+                           max_uses=MAX_USES_PER_CONTEXT, launch_args=launch_args) as pool:
+        planner = QueryPlanner()
+        planning = asyncio.create_task(plan_rows(input_file, scrape_queue, scrape_workers, writer, planner))
+        scrapers = [asyncio.create_task(scrape_worker(pool, scrape_queue, llm_queue, top_n, writer, planner,
+                                                  scrape_options, timings))
+                    for _ in range(scrape_workers)]
+        extractors = [asyncio.create_task(llm_worker(llm_queue, writer, planner, timings, cache,
+                                                     fast_path, audit_rate))
+                      for _ in range(llm_workers)]
+
+        await planning
+        await asyncio.gather(*scrapers)
+        for _ in range(llm_workers):
+            await llm_queue.put(None)
+        await asyncio.gather(*extractors)
+
+        print("Browser pool:", pool.wait_stats())
+
+async def main():
+    arg_parser = argparse.ArgumentParser(description="Google Shopping scraper with LLM parsing")
+    arg_parser.add_argument("--input", default="input.csv")
+    arg_parser.add_argument("--output", default="output.csv")
+    arg_parser.add_argument("--scrape-workers", type=int, default=SCRAPE_WORKERS)
+    arg_parser.add_argument("--llm-workers", type=int, default=LLM_WORKERS)
+    arg_parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE)
+    arg_parser.add_argument("--top-n", type=int, default=TOP_N)
+    arg_parser.add_argument("--cache-path", default=CACHE_PATH)
+    arg_parser.add_argument("--cache-ttl", type=int, default=CACHE_TTL_SECONDS, help="seconds")
+    arg_parser.add_argument("--no-cache", action="store_true", help="always call the LLM")
+    arg_parser.add_argument("--no-fast-path", action="store_true",
+                            help="send every card to the LLM, even when the regex data is complete")
+    arg_parser.add_argument("--audit-rate", type=float, default=0.0,
+                            help="fraction of fast-path cards also checked against the LLM")
+    arg_parser.add_argument("--resume", action="store_true",
+                            help="skip input rows finished by a previous run and append to the output")
+    arg_parser.add_argument("--lean", action="store_true",
+                            help="block images, fonts, stylesheets and third-party hosts while scraping")
+    arg_parser.add_argument("--shopping-url", default=SHOPPING_URL,
+                            help="search page to load (e.g. a local fixture server)")
+    arg_parser.add_argument("--rate", type=float, default=RATE_PER_HOST,
+                            help="searches per second per host")
+    arg_parser.add_argument("--burst", type=int, default=BURST_PER_HOST)
+    arg_parser.add_argument("--in-browser", action="store_true",
+                            help="extract card fields in one page evaluation instead of per-card HTML")
+    args = arg_parser.parse_args()
+
+    cache = None
+    if not args.no_cache:
+        cache = ExtractionCache(args.cache_path, ttl_seconds=args.cache_ttl,
+                                max_entries=CACHE_MAX_ENTRIES)
 
-            html_snippets = await scrape_google_product(query, top_n=3)
-            for snippet in html_snippets:
-                product_info = extract_product_info(snippet, expected_price)
-                products.append(product_info.dict())
+    output_file = args.output
+    writer = StreamingCsvWriter(output_file, output_file + CHECKPOINT_SUFFIX, resume=args.resume)
+    metrics = ScrapeMetrics()
+    rate_limiter = HostRateLimiter(rate=args.rate, burst=args.burst)
+    scrape_options = {"lean": args.lean, "base_url": args.shopping_url, "metrics": metrics,
+                      "rate_limiter": rate_limiter, "in_browser": args.in_browser}
+    if writer.completed:
+        print(f"Resuming: {len(writer.completed)} input rows already done")
+    try:
+        await run_pipeline(args.input, writer, args.scrape_workers, args.llm_workers,
+                           args.queue_size, args.top_n, cache=cache,
+                           fast_path=not args.no_fast_path, audit_rate=args.audit_rate,
+                           scrape_options=scrape_options)
+    finally:
+        writer.close()
+        print("Scrape metrics:", metrics.summary())
+        print("Rate limiter:", rate_limiter.metrics())
+        if cache is not None:
+            stats = cache.stats()
+            print(f"Extraction cache: {stats['hits']} hits, {stats['misses']} misses "
+                  f"({stats['hit_rate']:.0%} hit rate)")
+            cache.close()
 
-    # Save CSV
-    keys = ["title","description","price","img_urls","isPriceMatch"]
-    with open(output_file, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=keys)
-        writer.writeheader()
-        writer.writerows(products)
+    stats = llm_parser.fast_path_stats
+    print(f"Fast path: {stats['bypassed']} cards without LLM, {stats['escalated']} sent to LLM")
+    if stats["audited"]:
+        print(f"Fast path audit: {stats['audit_match']}/{stats['audited']} matched the LLM")
 
-    print("Scraping completed. Output saved to", output_file)
+    print(f"Scraping completed. {writer.rows_written} rows saved to", output_file)
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,88 @@
+import csv
+import os
+
+FIELDNAMES = ["title", "price", "img_urls", "isPriceMatch"]
+
+
+def load_checkpoint(checkpoint_file):
+    """Input row indexes recorded as finished by a previous run."""
+    if not os.path.exists(checkpoint_file):
+        return set()
+    with open(checkpoint_file, encoding="utf-8") as f:
+        return {int(line) for line in f if line.strip()}
+
+
+class StreamingCsvWriter:
+    """Writes product rows to CSV as soon as their input row is finished.
+
+    Rows can finish out of order in the pipeline; they are held back until every
+    earlier input row is finished so the output keeps input order. Each finished
+    input row is appended to `checkpoint_file` after its products are flushed, so
+    an interrupted job can be resumed with `resume=True` (a crash between the two
+    writes can repeat that row's products, never lose them).
+
+    Input order holds within one run only. `close` writes rows that were held
+    back behind a row that never finished, and a resumed run appends that row
+    when it is retried, so it ends up after them.
+    """
+
+    def __init__(self, output_file, checkpoint_file, fieldnames=FIELDNAMES, resume=False):
+        self.completed = load_checkpoint(checkpoint_file) if resume else set()
+        append = resume and os.path.exists(output_file)
+
+        self._out = open(output_file, "a" if append else "w", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._out, fieldnames=fieldnames, extrasaction="ignore")
+        if not append:
+            self._writer.writeheader()
+            self._out.flush()
+        self._checkpoint = open(checkpoint_file, "a" if resume else "w", encoding="utf-8")
+
+        self._next = 0
+        self._pending = {}
+        self.rows_written = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def is_completed(self, index):
+        return index in self.completed
+
+    def finish(self, index, rows, ok=True):
+        """Record the products of input row `index`.
+
+        With ok=False the rows are written but the input row is not checkpointed,
+        so a resumed run tries it again.
+        """
+        self._pending[index] = (rows, ok)
+        self._flush_ready()
+
+    def _flush_ready(self):
+        while True:
+            while self._next in self.completed:
+                self._next += 1
+            if self._next not in self._pending:
+                return
+            rows, ok = self._pending.pop(self._next)
+            self._writer.writerows(rows)
+            self._out.flush()
+            if ok:
+                self._checkpoint.write(f"{self._next}\n")
+                self._checkpoint.flush()
+            self.rows_written += len(rows)
+            self._next += 1
+
+    def close(self):
+        # Anything still pending is behind a row that never finished; write it anyway
+        # (out of order with that row once a resumed run retries it).
+        for index in sorted(self._pending):
+            rows, ok = self._pending[index]
+            self._writer.writerows(rows)
+            if ok:
+                self._checkpoint.write(f"{index}\n")
+            self.rows_written += len(rows)
+        self._pending.clear()
+        self._out.close()
+        self._checkpoint.close()
@@ -0,0 +1,77 @@
+import re
+import unicodedata
+from collections import OrderedDict
+
+_SEPARATORS = re.compile(r"[()\[\]{},/_|:;\"'-]+")
+_UNIT = re.compile(r"(\d+(?:\.\d+)?)\s*(gb|tb|mb|mah|mp|hz|w|inch|in)\b")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """Canonical form of a product query.
+
+    Case, punctuation, spacing and unit spacing are ignored, so
+    "Apple iPhone 15 (128 GB)" and "apple iphone 15 128gb" normalize the same.
+    """
+    text = unicodedata.normalize("NFKC", query).lower()
+    text = _SEPARATORS.sub(" ", text)
+    text = _UNIT.sub(r"\1\2", text)
+    return _SPACES.sub(" ", text).strip()
+
+
+class QueryGroup:
+    """One query to scrape and every input row that asked for it.
+
+    Once the query has been extracted (or has failed) `done` is set and
+    `products` holds the result (None on failure), so rows that show up later
+    can be answered without scraping again.
+    """
+
+    def __init__(self, key, query):
+        self.key = key
+        self.query = query
+        self.rows = []  # (row_index, expected_price)
+        self.done = False
+        self.products = None
+
+
+class QueryPlanner:
+    """Groups (row_index, query, expected_price) rows by normalized query as they stream in.
+
+    Each group is scraped once with the query text of its first row. In-flight
+    groups are kept until they finish; finished ones stay in an LRU of
+    `max_finished` groups to answer late duplicates, so memory does not grow
+    with the number of unique queries. A duplicate that shows up after its group
+    was evicted starts a new group (the extraction cache keeps that cheap).
+    """
+
+    def __init__(self, max_finished=1000):
+        self.max_finished = max_finished
+        self.active = {}
+        self.finished = OrderedDict()
+        self.rows_seen = 0
+        self.groups_planned = 0
+
+    def group_for(self, query):
+        """The group for `query` and whether it was just created."""
+        self.rows_seen += 1
+        key = normalize_query(query)
+        group = self.active.get(key)
+        if group is None:
+            group = self.finished.get(key)
+            if group is not None:
+                self.finished.move_to_end(key)
+        if group is not None:
+            return group, False
+        group = self.active[key] = QueryGroup(key, query)
+        self.groups_planned += 1
+        return group, True
+
+    def finish(self, group, products):
+        """Mark `group` done with its products (None on failure) and move it to the LRU."""
+        group.done = True
+        group.products = products
+        self.active.pop(group.key, None)
+        self.finished[group.key] = group
+        while len(self.finished) > self.max_finished:
+            self.finished.popitem(last=False)
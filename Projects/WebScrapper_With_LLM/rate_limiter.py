@@ -0,0 +1,96 @@
+import asyncio
+import time
+
+
+class _Bucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.backoff = 0.0
+        self.lock = asyncio.Lock()
+        self.waited = 0.0
+        self.acquired = 0
+
+
+class HostRateLimiter:
+    """Per-host token bucket shared by all scrape workers.
+
+    Each host gets `rate` requests per second with bursts of up to `burst`.
+    When a response is slow or a block page shows up, the host's rate is halved
+    and further requests are held back for an exponentially growing cool-down
+    (starting at `base_backoff`, capped at `max_backoff`). Every clean response
+    recovers the rate by `recovery` until it is back at the configured value.
+    """
+
+    def __init__(self, rate=0.5, burst=2, slow_seconds=15.0, base_backoff=5.0,
+                 max_backoff=300.0, min_rate=0.02, recovery=1.25):
+        self.rate = rate
+        self.burst = burst
+        self.slow_seconds = slow_seconds
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.min_rate = min_rate
+        self.recovery = recovery
+        self._buckets = {}
+
+    def _bucket(self, host):
+        if host not in self._buckets:
+            self._buckets[host] = _Bucket(self.rate, self.burst)
+        return self._buckets[host]
+
+    async def acquire(self, host):
+        """Wait until a request to `host` is allowed."""
+        bucket = self._bucket(host)
+        started = time.monotonic()
+        # Workers queue up on the lock, so tokens are handed out one at a time.
+        async with bucket.lock:
+            while True:
+                now = time.monotonic()
+                bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * bucket.rate)
+                bucket.updated = now
+                if now < bucket.blocked_until:
+                    await asyncio.sleep(bucket.blocked_until - now)
+                elif bucket.tokens >= 1:
+                    bucket.tokens -= 1
+                    break
+                else:
+                    await asyncio.sleep((1 - bucket.tokens) / bucket.rate)
+        bucket.waited += time.monotonic() - started
+        bucket.acquired += 1
+
+    def report(self, host, elapsed, blocked=False):
+        """Feed back how a request went so the limiter can slow down or recover."""
+        bucket = self._bucket(host)
+        if blocked or elapsed > self.slow_seconds:
+            bucket.backoff = min(self.max_backoff, bucket.backoff * 2 or self.base_backoff)
+            bucket.blocked_until = time.monotonic() + bucket.backoff
+            bucket.rate = max(self.min_rate, bucket.rate / 2)
+        else:
+            bucket.backoff = 0.0
+            bucket.rate = min(self.rate, bucket.rate * self.recovery)
+
+    def metrics(self):
+        """Current limits and time spent waiting, per host."""
+        return {
+            host: {
+                "rate": round(bucket.rate, 4),
+                "burst": self.burst,
+                "backoff": bucket.backoff,
+                "acquired": bucket.acquired,
+                "waited_seconds": round(bucket.waited, 3),
+            }
+            for host, bucket in self._buckets.items()
+        }
+
+
+_default_limiter = None
+
+
+def get_default_limiter():
+    """Limiter used by scrape_google_product when the caller does not pass one."""
+    global _default_limiter
+    if _default_limiter is None:
+        _default_limiter = HostRateLimiter()
+    return _default_limiter
@@ -1,36 +1,154 @@
 import asyncio
-from playwright.async_api import async_playwright
-from utils import human_delay
-
-async def scrape_google_product(query: str, top_n: int = 3):
-    """Scrape Google Shopping and return HTML snippets."""
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=False)
-        context = await browser.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-                       "(KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
-        )
-        page = await context.new_page()
-        await page.goto("https://www.google.com/shopping")
-
-        # Search product
-        await page.fill("textarea[name='q']", query)
-        await page.keyboard.press("Enter")
-        await human_delay(800, 10000)
-
-        await page.wait_for_selector("//g-inner-card[@jscontroller]", timeout=30000)
-
-        cards = page.locator("//g-inner-card[@jscontroller]")
-        count = await cards.count()
-        max_cards = min(top_n, count)
-
-        snippets = []
-        for i in range(max_cards):
-            card = cards.nth(i)
-            html = await card.inner_html()
-            snippets.append(html)
-            await human_delay(800, 1500)
-
-        await browser.close()
-    return snippets
+import time
+from urllib.parse import urlparse
+from browser_pool import get_default_pool
+from rate_limiter import get_default_limiter
+
+SHOPPING_URL = "https://www.google.com/shopping"
+CARD_SELECTOR = "//g-inner-card[@jscontroller]"
+
+# Lean mode: only the document and the scripts that render the cards are loaded.
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font", "stylesheet", "ping", "websocket", "manifest"}
+ALLOWED_HOST_SUFFIXES = ("google.com", "gstatic.com")
+
+# Pulls every card's fields in one round trip. The card HTML is only returned
+# when a field is missing, so the Python side can fall back to regex/LLM.
+EXTRACT_CARDS_JS = r"""
+(cards, topN) => cards.slice(0, topN).map(card => {
+    const titled = card.querySelector('[title]');
+    const title = titled ? titled.getAttribute('title') : null;
+    // Symbol before or after the amount, any separators; extractor.extract_price parses it.
+    const price = (card.innerText || '').match(
+      /(?:US\$|Rs\.|INR|USD|EUR|GBP|Rs|₹|\$|€|£)\s*\d[\d.,\u00a0\u202f]*|\d[\d.,\u00a0\u202f]*\s*(?:EUR|GBP|USD|INR|₹|\$|€|£)/);
+    const imgUrls = Array.from(card.querySelectorAll('img[src^="https://encrypted"]'))
+        .slice(0, 3).map(img => img.getAttribute('src'));
+    const complete = title && price && imgUrls.length;
+    return {
+        title: title,
+        price_text: price ? price[0] : null,
+        img_urls: imgUrls,
+        html: complete ? null : card.innerHTML,
+    };
+})
+"""
+
+# Signs that Google served a captcha / "unusual traffic" page instead of results.
+BLOCK_PAGE_MARKERS = ("/sorry/", "unusual traffic")
+
+
+class ScrapeMetrics:
+    """Bytes transferred and time-to-cards per query."""
+
+    def __init__(self):
+        self.queries = []
+
+    def record(self, query, bytes_transferred, time_to_cards, blocked):
+        self.queries.append({
+            "query": query,
+            "bytes": bytes_transferred,
+            "time_to_cards": time_to_cards,
+            "blocked_requests": blocked,
+        })
+
+    def summary(self):
+        if not self.queries:
+            return {"queries": 0}
+        n = len(self.queries)
+        return {
+            "queries": n,
+            "avg_kb": sum(q["bytes"] for q in self.queries) / n / 1024,
+            "avg_time_to_cards": sum(q["time_to_cards"] for q in self.queries) / n,
+            "blocked_requests": sum(q["blocked_requests"] for q in self.queries),
+        }
+
+
+def _is_allowed(request, first_party_host):
+    if request.resource_type in BLOCKED_RESOURCE_TYPES:
+        return False
+    host = urlparse(request.url).hostname or ""
+    return host == first_party_host or host.endswith(ALLOWED_HOST_SUFFIXES)
+
+
+async def _is_block_page(page):
+    if BLOCK_PAGE_MARKERS[0] in page.url:
+        return True
+    try:
+        return BLOCK_PAGE_MARKERS[1] in (await page.content())
+    except Exception:
+        return False
 
+
+async def _enable_lean_mode(page, first_party_host, counters):
+    async def handle(route):
+        if _is_allowed(route.request, first_party_host):
+            await route.continue_()
+        else:
+            counters["blocked"] += 1
+            await route.abort()
+
+    await page.route("**/*", handle)
+
+
+async def scrape_google_product(query: str, top_n: int = 3, pool=None,
+                                lean: bool = False, base_url: str = SHOPPING_URL, metrics=None,
+                                rate_limiter=None, in_browser: bool = False):
+    """Scrape Google Shopping and return HTML snippets.
+
+    Pages are borrowed from a BrowserPool so the browser stays warm between queries.
+    With lean=True images, fonts, stylesheets and third-party hosts are blocked and
+    navigation only waits for DOMContentLoaded before searching. When a
+    ScrapeMetrics is passed, bytes transferred and time-to-cards are recorded.
+
+    With in_browser=True the cards' title, price text and image URLs are read in a
+    single page evaluation and returned as dicts (see EXTRACT_CARDS_JS) instead of
+    one inner_html() round trip per card.
+
+    Requests are paced per host by a HostRateLimiter; slow responses and block
+    pages are reported back to it so it can back off.
+    """
+    pool = pool or get_default_pool()
+    rate_limiter = rate_limiter or get_default_limiter()
+    host = urlparse(base_url).hostname
+    async with pool.page() as page:
+        counters = {"blocked": 0}
+        sizes = []
+        if metrics is not None:
+            page.on("requestfinished", lambda request: sizes.append(asyncio.ensure_future(request.sizes())))
+        if lean:
+            await _enable_lean_mode(page, host, counters)
+
+        await rate_limiter.acquire(host)
+        started = time.perf_counter()
+        try:
+            await page.goto(base_url, wait_until="domcontentloaded" if lean else "load")
+
+            # Search product
+            await page.fill("textarea[name='q']", query)
+            await page.keyboard.press("Enter")
+            await page.wait_for_selector(CARD_SELECTOR, timeout=30000)
+        except Exception:
+            rate_limiter.report(host, time.perf_counter() - started, blocked=await _is_block_page(page))
+            raise
+        time_to_cards = time.perf_counter() - started
+        rate_limiter.report(host, time_to_cards)
+
+        if in_browser:
+            snippets = await page.eval_on_selector_all(CARD_SELECTOR, EXTRACT_CARDS_JS, top_n)
+        else:
+            cards = page.locator(CARD_SELECTOR)
+            count = await cards.count()
+            max_cards = min(top_n, count)
+
+            snippets = []
+            for i in range(max_cards):
+                card = cards.nth(i)
+                html = await card.inner_html()
+                snippets.append(html)
+
+        if metrics is not None:
+            results = await asyncio.gather(*sizes, return_exceptions=True)
+            transferred = sum(max(r["responseBodySize"], 0) + max(r["responseHeadersSize"], 0)
+                              for r in results if isinstance(r, dict))
+            metrics.record(query, transferred, time_to_cards, counters["blocked"])
+
+    return snippets